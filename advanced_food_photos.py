@@ -40,6 +40,8 @@ class AdvancedFoodPhotoDownloader:
         except Exception as e:
             print(f"❌ Failed to connect to Supabase: {e}")
             sys.exit(1)
+        
+        self.ensure_bucket()
     
     def get_menu_items(self):
         """Get all menu items"""
@@ -57,7 +59,8 @@ class AdvancedFoodPhotoDownloader:
         cleaned = cleaned.replace(" - Green Heaven", "")
         
         # Generate consistent but varied seeds for each food type
-        base_seed = abs(hash(cleaned)) % 1000
+        # (a digest, since builtin hash() changes between runs)
+        base_seed = int(hashlib.blake2b(cleaned.encode(), digest_size=4).hexdigest(), 16) % 1000
         
         # Food category mapping for better image selection
         food_categories = {
@@ -186,14 +189,16 @@ class AdvancedFoodPhotoDownloader:
             print(f"    ❌ LoremFlickr failed: {e}")
             return None
     
+    def ensure_bucket(self):
+        """Create the menu-images bucket once per run"""
+        try:
+            self.supabase.storage.create_bucket('menu-images')
+        except Exception:
+            pass  # Bucket might already exist
+    
     def upload_to_supabase(self, image_data, filename):
         """Upload to Supabase storage"""
         try:
-            try:
-                self.supabase.storage.create_bucket('menu-images')
-            except:
-                pass
-            
             if hasattr(image_data, 'getvalue'):
                 file_bytes = image_data.getvalue()
             else:
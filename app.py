@@ -5,9 +5,19 @@ import os
 import ssl
 import threading
 import shutil
+import tempfile
 from datetime import datetime, timedelta
+from collections import defaultdict, Counter, OrderedDict
 import uuid
 import io
+import hashlib
+import atexit
+import functools
+import itertools
+import time
+import logging
+import logging.handlers
+import queue
 import base64
 from werkzeug.utils import secure_filename
 
@@ -34,6 +44,14 @@ except ImportError:
     create_client = None  # Define create_client as None if not available
     print("📦 Supabase not available - using local storage fallback")
 
+# Fast JSON serialization (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    print("orjson not available - using standard JSON serialization")
+
 # Load environment variables
 try:
     from dotenv import load_dotenv
@@ -44,8 +62,41 @@ except ImportError:
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'green-heaven-secret-key-2024')
 
+if ORJSON_AVAILABLE:
+    from flask.json.provider import DefaultJSONProvider
+    
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by orjson"""
+        
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    
+    class OrjsonSocketJSON:
+        """json-module shim so Socket.IO packets are encoded with orjson"""
+        
+        @staticmethod
+        def dumps(obj, *args, **kwargs):
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        
+        @staticmethod
+        def loads(s, *args, **kwargs):
+            return orjson.loads(s)
+    
+    app.json = OrjsonProvider(app)
+    socketio_json = OrjsonSocketJSON
+else:
+    socketio_json = json
+
+# Compact JSON responses - no indentation or key sorting on API payloads
+app.json.compact = True
+app.json.sort_keys = False
+
 # Initialize Flask-SocketIO with flexible async mode and protocol compatibility
 # Try gevent first (for production), fallback to threading (for development)
+# Room broadcasts are encoded once per emit (python-socketio >= 5.8)
 try:
     import gevent
     socketio = SocketIO(
@@ -55,7 +106,8 @@ try:
         logger=False,
         engineio_logger=False,
         ping_timeout=60,
-        ping_interval=25
+        ping_interval=25,
+        json=socketio_json
     )
     print("🌟 Using gevent async mode for optimal performance")
 except ImportError:
@@ -66,7 +118,8 @@ except ImportError:
         logger=False,
         engineio_logger=False,
         ping_timeout=60,
-        ping_interval=25
+        ping_interval=25,
+        json=socketio_json
     )
     print("🔧 Using threading async mode for development")
 
@@ -148,6 +201,15 @@ if SUPABASE_AVAILABLE and create_client:
         print("⚠️ Supabase credentials not found - using local storage")
         print("💡 Add SUPABASE_URL and SUPABASE_ANON_KEY to environment variables")
 
+def get_supabase():
+    """Get the shared Supabase client (None when unavailable)
+    
+    The client is created once per process at import time and its PostgREST
+    session keeps HTTP connections alive, so callers should reuse it rather
+    than calling create_client again.
+    """
+    return supabase
+
 # Supabase Storage Functions for Images
 def upload_image_to_supabase(file_data, filename, content_type='image/jpeg'):
     """Upload image to Supabase Storage"""
@@ -183,6 +245,37 @@ def delete_image_from_supabase(filename):
         print(f"❌ Error deleting image from Supabase: {e}")
         return False
 
+def ttl_cache(seconds):
+    """Cache a no-argument loader's result for a number of seconds
+    
+    Empty results are not cached. Callers get shallow copies of the cached
+    rows so they can modify them freely, and the wrapped function gains a
+    cache_clear() to force the next call to reload.
+    """
+    def decorator(func):
+        state = {'value': None, 'expires': 0}
+        lock = threading.Lock()
+        
+        @functools.wraps(func)
+        def wrapper():
+            with lock:
+                if state['value'] is None or state['expires'] <= time.monotonic():
+                    state['value'] = func()
+                    state['expires'] = time.monotonic() + seconds
+                value = state['value']
+            return [dict(row) for row in value] if value else value
+        
+        def cache_clear():
+            with lock:
+                state['value'] = None
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+MENU_CACHE_TTL = 30  # seconds
+
+@ttl_cache(MENU_CACHE_TTL)
 def get_menu_items_from_supabase():
     """Load menu items from Supabase database with enhanced error handling"""
     if not supabase:
@@ -233,6 +326,7 @@ def save_menu_item_to_supabase(menu_item):
     
     try:
         result = supabase.table('menu_items').upsert(menu_item).execute()
+        get_menu_items_from_supabase.cache_clear()
         return True
     except Exception as e:
         print(f"❌ Error saving menu item to Supabase: {e}")
@@ -358,6 +452,31 @@ def load_data(collection_name):
         # Use local file storage
         return load_data_local(collection_name)
 
+def read_json_file(path):
+    """Parse a JSON data file, using orjson when available; empty files are []"""
+    with open(path, 'rb') as file:
+        content = file.read().strip()
+    if not content:
+        return []
+    if ORJSON_AVAILABLE:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+        return orjson.loads(content)
+    return json.loads(content)
+
+def write_file_atomically(path, content):
+    """Write text to a temp file beside path, then swap it into place"""
+    directory = os.path.dirname(path) or '.'
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as tmp:
+        tmp.write(content)
+        tmp.flush()
+        os.fsync(tmp.fileno())
+    try:
+        shutil.copymode(path, tmp.name)
+        os.replace(tmp.name, path)
+    except Exception:
+        os.remove(tmp.name)
+        raise
+
 def load_data_local(collection_name):
     """Load data from local JSON file with thread safety"""
     try:
@@ -377,11 +496,7 @@ def load_data_local(collection_name):
                 print(f"Info: File {filename} doesn't exist, returning empty list")
                 return []
                 
-            with open(filename, 'r', encoding='utf-8') as file:
-                content = file.read().strip()
-                if not content:
-                    return []
-                return json.loads(content)
+            return read_json_file(filename)
                 
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON in {collection_name}: {e}")
@@ -395,6 +510,34 @@ def load_data_local(collection_name):
         print(f"Error loading {collection_name}: {e}")
         return []
 
+SUPABASE_INSERT_CHUNK_SIZE = 500
+SUPABASE_UPSERT_CHUNK_SIZE = 1000
+
+def insert_rows_in_chunks(table_name, rows):
+    """Insert rows into a Supabase table a chunk at a time
+    
+    A chunk that fails is retried row by row so one bad row doesn't drop the
+    rest of its chunk. Returns the rows that still couldn't be inserted.
+    """
+    failed_rows = []
+    for start in range(0, len(rows), SUPABASE_INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + SUPABASE_INSERT_CHUNK_SIZE]
+        try:
+            supabase.table(table_name).insert(chunk).execute()
+        except Exception as e:
+            print(f"⚠️ Bulk insert into {table_name} failed, retrying rows individually: {e}")
+            # Collect row errors and report once per chunk rather than printing per row
+            row_errors = []
+            for row in chunk:
+                try:
+                    supabase.table(table_name).insert(row).execute()
+                except Exception as row_error:
+                    row_errors.append(row_error)
+                    failed_rows.append(row)
+            if row_errors:
+                print(f"❌ Failed to insert {len(row_errors)}/{len(chunk)} rows into {table_name}, first error: {row_errors[0]}")
+    return failed_rows
+
 def save_data(collection_name, data):
     """Save data to Supabase or local storage"""
     if supabase:
@@ -414,17 +557,21 @@ def save_data(collection_name, data):
             
             # For daily_totals, use upsert to handle updates
             if collection_name == 'daily_totals' and data:
-                for item in data:
-                    if 'id' in item:
-                        # Update existing record
-                        supabase.table(table_name).update(item).eq('id', item['id']).execute()
-                    else:
-                        # Insert new record
-                        supabase.table(table_name).insert(item).execute()
+                existing_rows = [item for item in data if 'id' in item]
+                new_rows = [item for item in data if 'id' not in item]
+                
+                # Update existing records with one bulk upsert per chunk
+                for start in range(0, len(existing_rows), SUPABASE_UPSERT_CHUNK_SIZE):
+                    chunk = existing_rows[start:start + SUPABASE_UPSERT_CHUNK_SIZE]
+                    supabase.table(table_name).upsert(chunk, on_conflict='id').execute()
+                
+                # Insert new records
+                if new_rows:
+                    insert_rows_in_chunks(table_name, new_rows)
             else:
-                # For other collections, insert new records
+                # For other collections, insert new records in bulk chunks
                 if data:
-                    supabase.table(table_name).insert(data if isinstance(data, list) else [data]).execute()
+                    insert_rows_in_chunks(table_name, data if isinstance(data, list) else [data])
             
             print(f"✅ Saved {len(data) if isinstance(data, list) else 1} items to Supabase {table_name}")
             
@@ -441,6 +588,7 @@ def save_data(collection_name, data):
 
 def save_data_local(collection_name, data):
     """Save data to local JSON file with thread safety and backup"""
+    global orders_file_mtime
     try:
         with storage_lock:
             # Create backup before saving
@@ -457,6 +605,10 @@ def save_data_local(collection_name, data):
                 print(f"Warning: Unknown collection name: {collection_name}")
                 return
             
+            # Whether the orders cache was current with the file before this write
+            orders_cache_current = (collection_name == 'orders'
+                                    and get_orders_file_mtime() == orders_file_mtime)
+            
             # Atomic write using temporary file
             temp_filename = filename + '.tmp'
             
@@ -466,6 +618,10 @@ def save_data_local(collection_name, data):
             # Atomic move (replaces original file)
             os.replace(temp_filename, filename)
             
+            # Our own write doesn't make the cache stale; someone else's before it still does
+            if orders_cache_current:
+                orders_file_mtime = get_orders_file_mtime()
+            
     except Exception as e:
         print(f"Error saving to local {collection_name}: {e}")
         # Clean up temp file if it exists
@@ -537,9 +693,8 @@ def load_backup_data(collection_name):
         # Get most recent backup
         latest_backup = max(backup_files, key=lambda x: x.stat().st_mtime)
         
-        with open(latest_backup, 'r', encoding='utf-8') as file:
-            print(f"📦 Restored data from backup: {latest_backup.name}")
-            return json.load(file)
+        print(f"📦 Restored data from backup: {latest_backup.name}")
+        return read_json_file(latest_backup)
             
     except Exception as e:
         print(f"Error loading backup for {collection_name}: {e}")
@@ -754,11 +909,236 @@ def update_daily_totals(amount, order_type):
     
     save_data('daily_totals', daily_totals)
 
+# Short-lived cache of serialized dashboard API responses - concurrent
+# dashboard polls share one computation; mutations invalidate it
+RESPONSE_CACHE_TTL = 3  # seconds
+response_cache = {}
+response_cache_lock = threading.Lock()
+# Source of generation numbers; next() on it is atomic, so concurrent
+# invalidations always move to a new, never-reused generation
+response_cache_generations = itertools.count(1)
+response_cache_generation = 0
+
+def cached_json_response(key, build):
+    """Return a JSON response for key, rebuilding it at most once per TTL"""
+    with response_cache_lock:
+        entry = response_cache.get(key)
+        now = time.monotonic()
+        if entry is None or entry[1] <= now or entry[2] != response_cache_generation:
+            generation = response_cache_generation
+            entry = (app.json.dumps(build()), now + RESPONSE_CACHE_TTL, generation)
+            response_cache[key] = entry
+    return app.response_class(entry[0], mimetype='application/json')
+
+def invalidate_cached_responses():
+    """Drop all cached dashboard responses after a state change"""
+    # Lock-free so it can be called while holding other locks (builders run
+    # under response_cache_lock and take the orders lock); entries built
+    # before the bump are treated as stale
+    global response_cache_generation
+    response_cache_generation = next(response_cache_generations)
+
+# In-memory orders cache - orders are read from storage once and served from
+# memory; local changes are flushed to disk in the background
+ORDERS_FLUSH_INTERVAL = 2  # seconds
+orders_cache = None
+orders_cache_lock = threading.RLock()
+orders_cache_dirty = False
+orders_flusher_started = False
+# ORDERS_FILE's mtime as of the last load or flush; a different value means
+# another process (e.g. clear_system.py) rewrote the file
+orders_file_mtime = None
+
+# Lookup indexes over the cached orders: id -> order, table -> set of order ids,
+# date (YYYY-MM-DD) -> set of order ids
+orders_by_id = {}
+orders_by_table = defaultdict(set)
+orders_by_date = defaultdict(set)
+
+# Running item name -> quantity totals over the cached orders
+popular_item_counts = Counter()
+
+# Running date -> {'revenue', 'orders'} totals over the cached orders
+daily_order_stats = defaultdict(lambda: {'revenue': 0, 'orders': 0})
+
+def order_item_counts(order):
+    """Count item quantities in a single order"""
+    counts = Counter()
+    for item in order.get('items', []):
+        counts[item.get('name', 'Unknown')] += item.get('quantity', 1)
+    return counts
+
+def order_date(order):
+    """Get an order's YYYY-MM-DD date, falling back to an ISO timestamp prefix"""
+    return order.get('date') or order.get('timestamp', '')[:10]
+
+def index_order(order):
+    """Add an order to the id, table and date indexes and running totals"""
+    orders_by_id[order.get('id')] = order
+    orders_by_table[order.get('table_number')].add(order.get('id'))
+    orders_by_date[order_date(order)].add(order.get('id'))
+    popular_item_counts.update(order_item_counts(order))
+    stats = daily_order_stats[order_date(order)]
+    stats['revenue'] += order.get('total', 0)
+    stats['orders'] += 1
+
+def unindex_order(order_id):
+    """Remove an order from the id and date indexes and running totals"""
+    order = orders_by_id.pop(order_id, None)
+    if order:
+        date_ids = orders_by_date.get(order_date(order))
+        if date_ids:
+            date_ids.discard(order_id)
+        stats = daily_order_stats.get(order_date(order))
+        if stats:
+            stats['revenue'] -= order.get('total', 0)
+            stats['orders'] -= 1
+        for name, qty in order_item_counts(order).items():
+            popular_item_counts[name] -= qty
+            if popular_item_counts[name] <= 0:
+                del popular_item_counts[name]
+
+def get_orders_file_mtime():
+    """ORDERS_FILE's modification time in ns, or None if it doesn't exist"""
+    try:
+        return os.stat(ORDERS_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+def get_cached_orders():
+    """Get the live orders list, loading it from storage on first use
+    
+    The cache is reloaded if the orders file was rewritten outside this process.
+    """
+    global orders_cache, orders_file_mtime
+    with orders_cache_lock:
+        if orders_cache is not None and get_orders_file_mtime() != orders_file_mtime:
+            print("🔄 Orders file changed on disk - reloading orders")
+            reset_orders_cache()
+        if orders_cache is None:
+            orders_file_mtime = get_orders_file_mtime()
+            orders_cache = load_data('orders') or []
+            for order in orders_cache:
+                index_order(order)
+        return orders_cache
+
+def get_cached_order(order_id):
+    """Get a single cached order by id"""
+    get_cached_orders()
+    return orders_by_id.get(order_id)
+
+class OrdersWriter:
+    """Group changes to the cached orders into one deferred disk write
+    
+    Usage:
+        with OrdersWriter() as orders:
+            ...mutate orders...
+    
+    The orders lock is held for the block and the cache is marked dirty on a
+    clean exit, so any number of changes cost a single background flush.
+    """
+    
+    def __enter__(self):
+        orders_cache_lock.acquire()
+        try:
+            return get_cached_orders()
+        except Exception:
+            orders_cache_lock.release()
+            raise
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                mark_orders_dirty()
+        finally:
+            orders_cache_lock.release()
+        return False
+
+def cache_order(order):
+    """Add a newly placed order to the in-memory cache"""
+    with orders_cache_lock:
+        if orders_cache is None:
+            # Not loaded yet - the first read picks the order up from storage
+            return
+        with OrdersWriter() as orders:
+            # A reload from storage may already include it
+            if order.get('id') not in orders_by_id:
+                orders.append(order)
+                index_order(order)
+
+def reset_orders_cache():
+    """Drop cached orders so the next read reloads from storage"""
+    global orders_cache, orders_cache_dirty
+    invalidate_cached_responses()
+    with orders_cache_lock:
+        orders_cache = None
+        orders_cache_dirty = False
+        orders_by_id.clear()
+        orders_by_table.clear()
+        orders_by_date.clear()
+        popular_item_counts.clear()
+        daily_order_stats.clear()
+
+def mark_orders_dirty():
+    """Schedule the cached orders to be written to local storage"""
+    global orders_cache_dirty, orders_flusher_started
+    invalidate_cached_responses()
+    with orders_cache_lock:
+        orders_cache_dirty = True
+        if not orders_flusher_started:
+            orders_flusher_started = True
+            socketio.start_background_task(orders_flush_loop)
+
+def flush_orders_cache():
+    """Write cached orders to local storage if they changed"""
+    global orders_cache_dirty
+    # The lock is held through the write so a clear can't land between the
+    # snapshot and the save and have the old orders written back over it
+    with orders_cache_lock:
+        if not orders_cache_dirty or orders_cache is None:
+            return
+        if get_orders_file_mtime() != orders_file_mtime:
+            # Rewritten by another process since we loaded it - that write wins
+            print("⚠️ Orders file changed on disk - dropping unsaved cached orders")
+            reset_orders_cache()
+            return
+        orders_cache_dirty = False
+        save_data_local('orders', list(orders_cache))
+
+def orders_flush_loop():
+    """Background task that periodically flushes the orders cache"""
+    while True:
+        socketio.sleep(ORDERS_FLUSH_INTERVAL)
+        try:
+            flush_orders_cache()
+        except Exception as e:
+            print(f"Warning: Failed to flush orders cache: {e}")
+
+# Don't lose pending order changes on shutdown
+atexit.register(flush_orders_cache)
+
 # Load persistent data
-all_orders = load_data('orders')
 manual_orders = load_data('manual_orders')
 
 # Load menu items from Supabase or use fallback
+def format_menu_item(item):
+    """Convert a Supabase menu row to app format, or None if its price is unusable"""
+    try:
+        price = float(item.get('price', 0))
+    except (TypeError, ValueError):
+        print(f"⚠️ Error formatting menu item {item.get('id', 'unknown')}: bad price {item.get('price')!r}")
+        return None
+    
+    return {
+        'id': item.get('id', ''),
+        'name': item.get('name', 'Unknown Item'),
+        'description': item.get('description', ''),
+        'price': price,
+        'image': item.get('image_url', '/static/images/m.png'),
+        'category': item.get('category', 'Main Course'),
+        'available': item.get('available', True)
+    }
+
 def load_menu_items():
     """Load menu items with enhanced Supabase integration and production support"""
     
@@ -777,22 +1157,7 @@ def load_menu_items():
         print(f"📊 Successfully loaded {len(supabase_menu)} menu items from Supabase")
         
         # Convert Supabase format to app format
-        formatted_items = []
-        for item in supabase_menu:
-            try:
-                formatted_item = {
-                    'id': item.get('id', ''),
-                    'name': item.get('name', 'Unknown Item'),
-                    'description': item.get('description', ''),
-                    'price': float(item.get('price', 0)),
-                    'image': item.get('image_url', '/static/images/m.png'),
-                    'category': item.get('category', 'Main Course'),
-                    'available': item.get('available', True)
-                }
-                formatted_items.append(formatted_item)
-            except Exception as e:
-                print(f"⚠️ Error formatting menu item {item.get('id', 'unknown')}: {e}")
-                continue
+        formatted_items = [row for row in map(format_menu_item, supabase_menu) if row is not None]
                 
         if formatted_items:
             print(f"✅ Successfully formatted {len(formatted_items)} menu items")
@@ -828,11 +1193,51 @@ def load_menu_items():
         }
     ]
 
-# Initialize menu items
-menu_items = load_menu_items()
+# Initialize menu items - keyed by id, in menu order
+menu_by_id = {item['id']: item for item in load_menu_items()}
+
+# Serialized menu payload and its ETag, reused while the menu is unchanged
+menu_json_cache = {'items': None, 'body': None, 'etag': None}
+
+def menu_json(items):
+    """Serialize menu items, reusing the cached body if they haven't changed"""
+    if menu_json_cache['items'] != items:
+        body = app.json.dumps(items)
+        menu_json_cache.update(
+            items=items,
+            body=body,
+            etag=hashlib.md5(body.encode('utf-8')).hexdigest()
+        )
+    return menu_json_cache['body'], menu_json_cache['etag']
+
+def invalidate_menu_json():
+    """Drop the serialized menu after a menu change"""
+    menu_json_cache.update(items=None, body=None, etag=None)
 
 # Initialize empty data (orders now use persistent storage)
-staff_alerts = []
+# Staff alerts keyed by id, in the order they were raised
+staff_alerts = OrderedDict()
+
+# Lookup index over staff alerts: table -> set of alert ids
+alerts_by_table = defaultdict(set)
+
+def add_alert(alert):
+    """Add a staff alert and index it"""
+    staff_alerts[alert['id']] = alert
+    alerts_by_table[alert['table_number']].add(alert['id'])
+    invalidate_cached_responses()
+
+def remove_alerts(alert_ids):
+    """Remove staff alerts by id, returns True if any were removed"""
+    removed = False
+    for alert_id in list(alert_ids):
+        alert = staff_alerts.pop(alert_id, None)
+        if alert:
+            alerts_by_table[alert['table_number']].discard(alert_id)
+            removed = True
+    if removed:
+        invalidate_cached_responses()
+    return removed
 
 @app.route('/debug')
 def debug_page():
@@ -877,20 +1282,21 @@ def staff_page():
 @app.route('/menu-management')
 def menu_management():
     """Menu management page"""
-    return render_template('menu_management.html', menu_items=menu_items)
+    return render_template('menu_management.html', menu_items=list(menu_by_id.values()))
 
 @app.route('/system-status')
 def system_status():
     """System status and diagnostics page"""
     return render_template('system_status.html')
 
+# All tables in the restaurant (12 regular tables + 2 VIP), built once at import
+TABLE_NUMBERS = tuple(str(i) for i in range(1, 13)) + ('VIP1', 'VIP2')
+VALID_TABLES = frozenset(TABLE_NUMBERS)
+
 def get_table_status():
     """Get status of all tables"""
     tables = {}
-    # Initialize all tables (assuming 12 regular tables + 2 VIP)
-    table_numbers = [str(i) for i in range(1, 13)] + ['VIP1', 'VIP2']
-    
-    for table_num in table_numbers:
+    for table_num in TABLE_NUMBERS:
         tables[table_num] = {
             'number': table_num,
             'status': 'empty',  # empty, occupied, needs_attention
@@ -902,9 +1308,7 @@ def get_table_status():
         }
     
     # Update with current orders
-    orders = load_data('orders')
-    if not orders:
-        orders = []
+    orders = get_cached_orders()
         
     for order in orders:
         table_num = order['table_number']
@@ -916,7 +1320,7 @@ def get_table_status():
             tables[table_num]['last_activity'] = order['timestamp']
     
     # Update with current alerts
-    for alert in staff_alerts:
+    for alert in staff_alerts.values():
         table_num = alert['table_number']
         if table_num in tables:
             tables[table_num]['status'] = 'needs_attention'
@@ -941,8 +1345,8 @@ def call_staff():
         if not table_number or not customer_name:
             return jsonify({'status': 'error', 'message': 'Table number and customer name are required'}), 400
         
-        # Validate table number format
-        if not (table_number.isdigit() or table_number.startswith('VIP')):
+        # Validate table number against the known tables
+        if table_number not in VALID_TABLES:
             return jsonify({'status': 'error', 'message': 'Invalid table number format'}), 400
         
         alert = {
@@ -954,7 +1358,7 @@ def call_staff():
         }
         
         # Add to in-memory alerts
-        staff_alerts.append(alert)
+        add_alert(alert)
         
         # Emit to staff room with error handling
         try:
@@ -1023,6 +1427,7 @@ def place_order():
         # Save to persistent storage
         try:
             add_document('orders', order)
+            cache_order(order)
         except Exception as save_error:
             print(f"Error saving order: {save_error}")
             return jsonify({'status': 'error', 'message': 'Failed to save order'}), 500
@@ -1079,7 +1484,9 @@ def add_menu_item():
             'image': data.get('image', ''),
             'category': data.get('category', 'Main Course')
         }
-        menu_items.append(menu_item)
+        menu_by_id[menu_item['id']] = menu_item
+        invalidate_cached_responses()
+        invalidate_menu_json()
         
         # Save to Supabase if available
         if supabase:
@@ -1176,22 +1583,16 @@ def update_order_status():
         if not order_id or not new_status:
             return jsonify({'status': 'error', 'message': 'Order ID and status are required'}), 400
         
-        order_found = False
-        orders = load_data('orders')
-        if not orders:
-            orders = []
-            
-        for order in orders:
-            if order['id'] == order_id:
-                order['status'] = new_status
-                order_found = True
-                # Update in database
-                update_document('orders', order_id, {'status': new_status})
-                break
-        
-        if not order_found:
+        order = get_cached_order(order_id)
+        if not order:
             return jsonify({'status': 'error', 'message': 'Order not found'}), 404
         
+        with OrdersWriter():
+            order['status'] = new_status
+        # Update in database
+        if supabase:
+            update_document('orders', order_id, {'status': new_status})
+        
         # Emit to customers and staff
         socketio.emit('order_status_updated', {
             'order_id': order_id, 
@@ -1214,8 +1615,7 @@ def dismiss_alert():
         if not alert_id:
             return jsonify({'status': 'error', 'message': 'Alert ID is required'}), 400
         
-        global staff_alerts
-        staff_alerts = [alert for alert in staff_alerts if alert['id'] != alert_id]
+        remove_alerts([alert_id])
         
         return jsonify({'status': 'success'})
     except Exception as e:
@@ -1223,9 +1623,19 @@ def dismiss_alert():
 
 @app.route('/api/menu')
 def get_menu():
-    """Get all menu items with fresh data from Supabase"""
+    """Get all menu items with fresh data from Supabase (ETag-aware)"""
     fresh_menu_items = load_menu_items()
-    return jsonify(fresh_menu_items)
+    body, etag = menu_json(fresh_menu_items)
+    
+    # Unchanged menu - let the client reuse its copy instead of resending it
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/menu-debug')
 def get_menu_debug():
@@ -1256,7 +1666,8 @@ def get_menu_debug():
     if supabase:
         debug_info['menu_loading']['supabase_attempt'] = True
         try:
-            supabase_menu = supabase.table('menu_items').select('*').execute()
+            # Only the row count is reported, so don't fetch full rows
+            supabase_menu = supabase.table('menu_items').select('id').execute()
             if supabase_menu.data:
                 debug_info['menu_loading']['supabase_success'] = True
                 debug_info['menu_loading']['item_count'] = len(supabase_menu.data)
@@ -1298,9 +1709,7 @@ def get_menu_item(item_id):
 @app.route('/api/orders')
 def get_orders():
     """Get orders with optional status filter"""
-    orders = load_data('orders')
-    if not orders:
-        orders = []
+    orders = get_cached_orders()
         
     status_filter = request.args.get('status')
     if status_filter:
@@ -1324,8 +1733,11 @@ def clear_all_orders():
             except Exception as e:
                 print(f"⚠️ Error clearing Supabase orders: {e}")
         
-        # Clear local storage
-        save_data('orders', [])
+        # Clear local storage - under the orders lock so a pending flush
+        # can't write the old orders back after the clear
+        with orders_cache_lock:
+            save_data('orders', [])
+            reset_orders_cache()
         
         # Reset daily totals for today
         daily_totals = load_data('daily_totals')
@@ -1352,9 +1764,7 @@ def clear_all_orders():
 @app.route('/api/orders/stats')
 def get_order_stats():
     """Get order statistics"""
-    orders = load_data('orders')
-    if not orders:
-        orders = []
+    orders = get_cached_orders()
         
     stats = {
         'total': len(orders),
@@ -1444,7 +1854,7 @@ def generate_pdf_report():
         end_date = data.get('end_date', datetime.now().strftime('%Y-%m-%d'))
         
         # Collect data for the period
-        digital_orders = load_data('orders') or []
+        digital_orders = get_cached_orders()
         manual_orders = load_data('manual_orders') or []
         
         # Filter orders by date range
@@ -1605,41 +2015,52 @@ def generate_pdf_report():
 @app.route('/api/alerts')
 def get_alerts():
     """Get all active alerts"""
-    return jsonify(staff_alerts)
+    return jsonify(list(staff_alerts.values()))
 
 @app.route('/api/tables')
 def get_tables_api():
     """API endpoint to get table status data"""
-    tables = get_table_status()
-    return jsonify(tables)
+    return cached_json_response('tables', get_table_status)
+
+# Parts of the system status that can't change while the process runs
+SYSTEM_STATUS_BASE = {
+    'firebase_available': False,
+    'firebase_connected': False,
+    'pdf_generation': PDF_AVAILABLE,
+    'environment': 'production' if os.getenv('PORT') else 'development',
+    'data_storage': 'local',
+    # Local storage status
+    'storage_status': 'file-based JSON storage with backup',
+    # Get environment variables status (without exposing values)
+    'environment_variables': {
+        'SECRET_KEY': bool(os.getenv('SECRET_KEY')),
+        'PORT': os.getenv('PORT', 'not_set')
+    }
+}
 
-@app.route('/api/system-status')
-def get_system_status():
-    """Get system status and diagnostics"""
-    try:
-        status = {
-            'timestamp': datetime.now().isoformat(),
-            'firebase_available': False,
-            'firebase_connected': False,
-            'pdf_generation': PDF_AVAILABLE,
-            'environment': 'production' if os.getenv('PORT') else 'development',
-            'data_storage': 'local'
-        }
-        
-        # Local storage status
-        status['storage_status'] = 'file-based JSON storage with backup'
-        status['data_files'] = {
+# Data file existence checks are reused for a few seconds between polls
+DATA_FILES_CHECK_TTL = 5  # seconds
+data_files_status = {'files': None, 'expires': 0}
+
+def get_data_files_status():
+    """Get which local data files exist, rechecking at most once per TTL"""
+    now = time.monotonic()
+    if data_files_status['files'] is None or data_files_status['expires'] <= now:
+        data_files_status['files'] = {
             'orders': os.path.exists('data/orders.json'),
             'manual_orders': os.path.exists('data/manual_orders.json'),
             'daily_totals': os.path.exists('data/daily_totals.json')
         }
-        
-        # Get environment variables status (without exposing values)
-        env_vars = {
-            'SECRET_KEY': bool(os.getenv('SECRET_KEY')),
-            'PORT': os.getenv('PORT', 'not_set')
-        }
-        status['environment_variables'] = env_vars
+        data_files_status['expires'] = now + DATA_FILES_CHECK_TTL
+    return data_files_status['files']
+
+@app.route('/api/system-status')
+def get_system_status():
+    """Get system status and diagnostics"""
+    try:
+        status = SYSTEM_STATUS_BASE.copy()
+        status['timestamp'] = datetime.now().isoformat()
+        status['data_files'] = get_data_files_status()
         
         return jsonify(status)
         
@@ -1652,29 +2073,32 @@ def get_system_status():
 @app.route('/api/tables/<table_number>/clear-alerts', methods=['POST'])
 def clear_table_alerts(table_number):
     """Clear alerts for a specific table"""
-    global staff_alerts
     # Remove alerts for the specific table
-    staff_alerts = [alert for alert in staff_alerts if not (alert.get('table') == table_number)]
+    remove_alerts(alerts_by_table.get(table_number, ()))
     return jsonify({'success': True})
 
 @app.route('/api/tables/clear-all-alerts', methods=['POST'])
 def clear_all_table_alerts():
     """Clear all table alerts"""
-    global staff_alerts
-    staff_alerts = []
+    staff_alerts.clear()
+    alerts_by_table.clear()
+    invalidate_cached_responses()
     return jsonify({'success': True})
 
 @app.route('/api/menu/stats')
 def get_menu_stats():
     """Get menu statistics"""
-    total = len(menu_items)
-    available = len([item for item in menu_items if item.get('available', True)])
-    stats = {
+    return cached_json_response('menu_stats', build_menu_stats)
+
+def build_menu_stats():
+    """Compute menu availability statistics"""
+    total = len(menu_by_id)
+    available = len([item for item in menu_by_id.values() if item.get('available', True)])
+    return {
         'total': total,
         'available': available,
         'unavailable': total - available
     }
-    return jsonify(stats)
 
 @app.route('/api/menu-item/<item_id>/availability', methods=['PATCH'])
 def update_item_availability(item_id):
@@ -1689,16 +2113,35 @@ def update_item_availability(item_id):
             return jsonify({'status': 'error', 'message': 'Available status is required'}), 400
         
         # Find and update the item
-        for item in menu_items:
-            if item['id'] == item_id:
-                item['available'] = available
-                socketio.emit('menu_updated', item)
-                return jsonify({'status': 'success'})
+        item = menu_by_id.get(item_id)
+        if not item:
+            return jsonify({'status': 'error', 'message': 'Item not found'}), 404
         
-        return jsonify({'status': 'error', 'message': 'Item not found'}), 404
+        item['available'] = available
+        invalidate_cached_responses()
+        invalidate_menu_json()
+        # Only the availability flag changed, so don't resend the whole item
+        socketio.emit('menu_updated', {'id': item_id, 'available': available})
+        return jsonify({'status': 'success'})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+MENU_UPDATE_RETRIES = 2
+
+def push_menu_item_update(item_id, supabase_item):
+    """Background task that writes an edited menu item to Supabase"""
+    for attempt in range(1, MENU_UPDATE_RETRIES + 1):
+        try:
+            supabase.table('menu_items').update(supabase_item).eq('id', item_id).execute()
+            get_menu_items_from_supabase.cache_clear()
+            print(f"✅ Updated menu item in Supabase: {supabase_item['name']}")
+            return
+        except Exception as e:
+            print(f"⚠️ Failed to update in Supabase (attempt {attempt}/{MENU_UPDATE_RETRIES}): {e}")
+            if attempt < MENU_UPDATE_RETRIES:
+                socketio.sleep(attempt)
+    # Local update is kept even if Supabase fails
+
 @app.route('/api/menu-item/<item_id>', methods=['PUT'])
 def update_menu_item(item_id):
     """Update a menu item (name, price, image)"""
@@ -1708,44 +2151,42 @@ def update_menu_item(item_id):
             return jsonify({'status': 'error', 'message': 'No data provided'}), 400
         
         # Find the item to update
-        for item in menu_items:
-            if item['id'] == item_id:
-                # Update fields if provided
-                if 'name' in data:
-                    item['name'] = data['name'].strip()
-                if 'price' in data:
-                    try:
-                        item['price'] = float(data['price'])
-                    except (ValueError, TypeError):
-                        return jsonify({'status': 'error', 'message': 'Invalid price format'}), 400
-                if 'description' in data:
-                    item['description'] = data['description'].strip()
-                if 'category' in data:
-                    item['category'] = data['category'].strip()
-                if 'image_url' in data:
-                    item['image_url'] = data['image_url'].strip()
-                
-                # Update in Supabase
-                try:
-                    if supabase:
-                        supabase_item = item.copy()
-                        result = supabase.table('menu_items').update(supabase_item).eq('id', item_id).execute()
-                        print(f"✅ Updated menu item in Supabase: {item['name']}")
-                except Exception as e:
-                    print(f"⚠️ Failed to update in Supabase: {e}")
-                    # Continue with local update even if Supabase fails
-                
-                # Emit update via socket
-                socketio.emit('menu_item_updated', item)
-                
-                return jsonify({
-                    'status': 'success', 
-                    'message': 'Menu item updated successfully',
-                    'item': item
-                })
+        item = menu_by_id.get(item_id)
+        if not item:
+            return jsonify({'status': 'error', 'message': 'Item not found'}), 404
         
-        # If not found, always return a response
-        return jsonify({'status': 'error', 'message': 'Item not found'}), 404
+        # Update fields if provided, tracking what changed
+        patch = {}
+        if 'name' in data:
+            patch['name'] = data['name'].strip()
+        if 'price' in data:
+            try:
+                patch['price'] = float(data['price'])
+            except (ValueError, TypeError):
+                return jsonify({'status': 'error', 'message': 'Invalid price format'}), 400
+        if 'description' in data:
+            patch['description'] = data['description'].strip()
+        if 'category' in data:
+            patch['category'] = data['category'].strip()
+        if 'image_url' in data:
+            patch['image_url'] = data['image_url'].strip()
+        item.update(patch)
+        
+        # Update in Supabase in the background so the response doesn't wait on it
+        if supabase:
+            socketio.start_background_task(push_menu_item_update, item_id, item.copy())
+        
+        invalidate_cached_responses()
+        invalidate_menu_json()
+        
+        # Emit only the changed fields via socket
+        socketio.emit('menu_item_updated', {'id': item_id, 'patch': patch})
+        
+        return jsonify({
+            'status': 'success', 
+            'message': 'Menu item updated successfully',
+            'item': item
+        })
             
     except Exception as e:
         print(f"Error updating menu item: {e}")
@@ -1755,11 +2196,11 @@ def update_menu_item(item_id):
 def delete_menu_item(item_id):
     """Delete a menu item"""
     try:
-        global menu_items
-        original_length = len(menu_items)
-        menu_items = [item for item in menu_items if item['id'] != item_id]
+        item = menu_by_id.pop(item_id, None)
         
-        if len(menu_items) < original_length:
+        if item:
+            invalidate_cached_responses()
+            invalidate_menu_json()
             socketio.emit('menu_item_deleted', {'item_id': item_id})
             return jsonify({'status': 'success'})
         else:
@@ -1770,23 +2211,24 @@ def delete_menu_item(item_id):
 @app.route('/api/tables')
 def get_tables():
     """Get table status information"""
-    tables = get_table_status()
-    return jsonify(tables)
+    return cached_json_response('tables', get_table_status)
 
 # Dashboard API Routes
 @app.route('/api/tables/<table_id>/clean', methods=['POST'])
 def clean_table(table_id):
     """Clean/reset a table"""
     try:
-        orders = load_data('orders')
+        get_cached_orders()
         # Remove orders for this table
-        if orders:
-            orders = [order for order in orders if order.get('table_number') != table_id]
-            save_data('orders', orders)
+        if orders_by_table.get(table_id):
+            with OrdersWriter() as orders:
+                table_order_ids = orders_by_table.pop(table_id, set())
+                for order_id in table_order_ids:
+                    unindex_order(order_id)
+                orders[:] = [order for order in orders if order.get('id') not in table_order_ids]
         
         # Clear alerts for this table
-        global staff_alerts
-        staff_alerts = [alert for alert in staff_alerts if alert.get('table') != table_id]
+        remove_alerts(alerts_by_table.get(table_id, ()))
         
         # Emit update
         socketio.emit('table_update', {'table_id': table_id, 'status': 'cleaned'}, to='staff')
@@ -1805,33 +2247,26 @@ def update_order_status_new(order_id):
         if not new_status:
             return jsonify({'status': 'error', 'message': 'Status is required'}), 400
         
-        orders = load_data('orders')
-        if not orders:
+        # Find and update the order
+        order = get_cached_order(order_id)
+        if not order:
             return jsonify({'status': 'error', 'message': 'Order not found'}), 404
         
-        # Find and update the order
-        order_updated = False
-        for order in orders:
-            if order.get('id') == order_id:
-                order['status'] = new_status
-                order['updated_at'] = datetime.now().isoformat()
-                order_updated = True
-                # Update in Supabase database
-                try:
-                    update_document('orders', order_id, {'status': new_status})
-                except Exception as e:
-                    print(f"Warning: Failed to update order in Supabase: {e}")
-                break
+        with OrdersWriter():
+            order['status'] = new_status
+            order['updated_at'] = datetime.now().isoformat()
+        # Update in Supabase database
+        if supabase:
+            try:
+                update_document('orders', order_id, {'status': new_status})
+            except Exception as e:
+                print(f"Warning: Failed to update order in Supabase: {e}")
         
-        if order_updated:
-            save_data('orders', orders)
-            socketio.emit('order_update', {
-                'order_id': order_id, 
-                'status': new_status
-            }, to='staff')
-            return jsonify({'status': 'success'})
-        else:
-            return jsonify({'status': 'error', 'message': 'Order not found'}), 404
+        socketio.emit('order_update', {
+            'order_id': order_id, 
+            'status': new_status
+        }, to='staff')
+        return jsonify({'status': 'success'})
             
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -1840,16 +2275,8 @@ def update_order_status_new(order_id):
 def resolve_alert(alert_id):
     """Resolve a customer alert"""
     try:
-        global staff_alerts
         # Find and remove the alert
-        alert_found = False
-        for i, alert in enumerate(staff_alerts):
-            if alert.get('id') == alert_id:
-                staff_alerts.pop(i)
-                alert_found = True
-                break
-        
-        if alert_found:
+        if remove_alerts([alert_id]):
             socketio.emit('alert_resolved', {'alert_id': alert_id}, to='staff')
             return jsonify({'status': 'success'})
         else:
@@ -1869,17 +2296,13 @@ def respond_to_alert(alert_id):
             return jsonify({'status': 'error', 'message': 'Response text is required'}), 400
         
         # Find the alert
-        alert = None
-        for a in staff_alerts:
-            if a.get('id') == alert_id:
-                alert = a
-                break
+        alert = staff_alerts.get(alert_id)
         
         if not alert:
             return jsonify({'status': 'error', 'message': 'Alert not found'}), 404
         
         # Send response to customer
-        table_number = alert.get('table')
+        table_number = alert.get('table_number')
         socketio.emit('staff_response', {
             'message': response_text,
             'timestamp': datetime.now().isoformat()
@@ -1894,52 +2317,51 @@ def respond_to_alert(alert_id):
 def get_analytics():
     """Get analytics data for dashboard"""
     try:
-        orders = load_data('orders') or []
-        manual_orders = load_data('manual_orders') or []
-        daily_totals = load_data('daily_totals') or {}
-        
-        # Calculate analytics
-        today = datetime.now().strftime('%Y-%m-%d')
-        today_orders = [order for order in orders if order.get('timestamp', '').startswith(today)]
-        
-        total_revenue = sum(order.get('total', 0) for order in today_orders)
-        total_orders = len(today_orders)
-        avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-        
-        # Table utilization
-        tables = get_table_status()
-        occupied_tables = len([t for t in tables if t.get('status') == 'occupied'])
-        total_tables = len(tables)
-        table_utilization = (occupied_tables / total_tables * 100) if total_tables > 0 else 0
-        
-        analytics = {
-            'daily_revenue': total_revenue,
-            'daily_orders': total_orders,
-            'avg_order_value': avg_order_value,
-            'table_utilization': table_utilization,
-            'peak_hours': '12:00 PM - 2:00 PM',  # Static for now
-            'popular_items': get_popular_items(orders)
-        }
-        
-        return jsonify(analytics)
-        
+        return cached_json_response('analytics', build_analytics)
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-def get_popular_items(orders):
-    """Get most popular menu items"""
-    item_counts = {}
+def build_analytics():
+    """Compute dashboard analytics from the cached orders"""
+    # Read today's figures from the running totals instead of re-summing orders
+    today = get_today_date()
+    with orders_cache_lock:
+        get_cached_orders()
+        today_stats = daily_order_stats.get(today, {'revenue': 0, 'orders': 0})
+        total_revenue = today_stats['revenue']
+        total_orders = today_stats['orders']
+    avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
     
-    for order in orders:
-        items = order.get('items', [])
-        for item in items:
-            name = item.get('name', 'Unknown')
-            quantity = item.get('quantity', 1)
-            item_counts[name] = item_counts.get(name, 0) + quantity
+    # Table utilization
+    tables = get_table_status()
+    occupied_tables = len([t for t in tables if t.get('status') == 'occupied'])
+    total_tables = len(tables)
+    table_utilization = (occupied_tables / total_tables * 100) if total_tables > 0 else 0
     
-    # Sort by quantity and return top 5
-    popular = sorted(item_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-    return [{'name': name, 'quantity': qty} for name, qty in popular]
+    return {
+        'daily_revenue': total_revenue,
+        'daily_orders': total_orders,
+        'avg_order_value': avg_order_value,
+        'table_utilization': table_utilization,
+        'peak_hours': '12:00 PM - 2:00 PM',  # Static for now
+        'popular_items': get_popular_items()
+    }
+
+def get_popular_items():
+    """Get most popular menu items from the running item totals"""
+    return [{'name': name, 'quantity': qty} for name, qty in popular_item_counts.most_common(5)]
+
+# Socket event logging goes through a queue so handlers never block on
+# stdout; set SOCKET_LOG_LEVEL=WARNING to silence connect/join messages
+socket_log_queue = queue.Queue(-1)
+socket_log_listener = logging.handlers.QueueListener(socket_log_queue, logging.StreamHandler())
+socket_log_listener.start()
+atexit.register(socket_log_listener.stop)
+
+socket_logger = logging.getLogger('green_heaven.socket')
+socket_logger.setLevel(os.getenv('SOCKET_LOG_LEVEL', 'INFO').upper())
+socket_logger.addHandler(logging.handlers.QueueHandler(socket_log_queue))
+socket_logger.propagate = False
 
 # Socket events with improved error handling and protocol compatibility
 @socketio.on('join_staff_room')
@@ -1947,9 +2369,9 @@ def on_join_staff():
     try:
         join_room('staff')
         emit('joined_staff_room')
-        print(f"✅ Staff joined room")
+        socket_logger.info("✅ Staff joined room")
     except Exception as e:
-        print(f"❌ Error joining staff room: {e}")
+        socket_logger.error(f"❌ Error joining staff room: {e}")
         emit('error', {'message': 'Failed to join staff room'})
 
 @socketio.on('join_customer_room')
@@ -1966,30 +2388,30 @@ def on_join_customer(data):
             
         join_room(f'table_{table_number}')
         emit('joined_customer_room')
-        print(f"✅ Customer joined table room: {table_number}")
+        socket_logger.info(f"✅ Customer joined table room: {table_number}")
     except Exception as e:
-        print(f"❌ Error joining customer room: {e}")
+        socket_logger.error(f"❌ Error joining customer room: {e}")
         emit('error', {'message': 'Failed to join customer room'})
 
 @socketio.on('connect')
 def on_connect():
     try:
-        print(f"✅ Socket.IO client connected")
+        socket_logger.info("✅ Socket.IO client connected")
     except Exception as e:
-        print(f"❌ Error on connect: {e}")
+        socket_logger.error(f"❌ Error on connect: {e}")
 
 @socketio.on('disconnect')
 def on_disconnect(auth=None):
     try:
-        print(f"🔌 Socket.IO client disconnected")
+        socket_logger.info("🔌 Socket.IO client disconnected")
     except Exception as e:
-        print(f"❌ Error on disconnect: {e}")
+        socket_logger.error(f"❌ Error on disconnect: {e}")
 
 @socketio.on_error_default
 def default_error_handler(e):
-    print(f"❌ Socket.IO error: {e}")
+    socket_logger.error(f"❌ Socket.IO error: {e}")
     if hasattr(e, 'args') and len(e.args) > 0:
-        print(f"Error details: {e.args[0]}")
+        socket_logger.error(f"Error details: {e.args[0]}")
     # Send generic error response to client
     emit('error', {'message': 'A socket error occurred'})
 
@@ -75,31 +75,52 @@ def convert_items_to_beverages_desserts():
     
     all_conversions = beverages_to_create + desserts_to_create
     
+    # Lowercase every item name once instead of once per conversion
+    lowered_items = [(item.get('name', '').lower(), item) for item in current_items]
+    
+    # Collect all conversions first so they can be sent in one request
+    conversions_by_id = {}
     for conversion in all_conversions:
         # Find matching item
-        matching_item = None
-        for item in current_items:
-            if conversion['name_contains'].lower() in item.get('name', '').lower():
-                matching_item = item
-                break
+        needle = conversion['name_contains'].lower()
+        matching_item = next((item for name, item in lowered_items if needle in name), None)
         
         if matching_item:
-            try:
-                # Update the item
-                result = supabase.table('menu_items').update({
-                    'name': conversion['new_name'],
-                    'description': conversion['new_description'],
-                    'price': conversion['new_price'],
-                    'category': conversion['category'],
-                    'image_url': '/static/images/m.png'
-                }).eq('id', matching_item['id']).execute()
-                
-                print(f"✅ Converted: {matching_item['name']} -> {conversion['new_name']} ({conversion['category']})")
-                
-            except Exception as e:
-                print(f"❌ Failed to convert {matching_item['name']}: {e}")
+            conversions_by_id[matching_item['id']] = (matching_item, conversion)
         else:
             print(f"⚠️  Could not find item containing '{conversion['name_contains']}'")
+    
+    if not conversions_by_id:
+        return
+    
+    # Full rows (select('*') from get_menu_items_from_supabase) keyed on id, so
+    # the upsert updates the matched items and never inserts partial ones
+    payload = [
+        {
+            **item,
+            'name': conversion['new_name'],
+            'description': conversion['new_description'],
+            'price': conversion['new_price'],
+            'category': conversion['category'],
+            'image_url': '/static/images/m.png'
+        }
+        for item, conversion in conversions_by_id.values()
+    ]
+    
+    try:
+        # Update all matched items in a single upsert
+        result = supabase.table('menu_items').upsert(payload, on_conflict='id').execute()
+        get_menu_items_from_supabase.cache_clear()
+        converted_ids = {row.get('id') for row in (result.data or [])}
+        
+        for item, conversion in conversions_by_id.values():
+            if item['id'] in converted_ids:
+                print(f"✅ Converted: {item['name']} -> {conversion['new_name']} ({conversion['category']})")
+            else:
+                print(f"❌ Failed to convert {item['name']}: not returned by Supabase")
+                
+    except Exception as e:
+        print(f"❌ Failed to convert items: {e}")
 
 def verify_final_categories():
     """Verify the final category distribution"""
@@ -6,12 +6,14 @@ Debug script to identify the specific issue with Supabase updates
 import os
 import sys
 import time
+import argparse
 
 # Add the current directory to Python path
 sys.path.append('/Users/dinuthfernando/Documents/projects/green heaven')
 
 try:
-    from app import supabase
+    from app import get_supabase
+    supabase = get_supabase()
     print("✅ Successfully imported Supabase client")
 except Exception as e:
     print(f"❌ Error importing: {e}")
@@ -61,10 +63,41 @@ def debug_single_update():
         import traceback
         traceback.print_exc()
 
-def check_permissions():
-    """Check what operations we can perform"""
+# Optional SQL function that reports privileges in one call without writing
+# a test row. Create it in the Supabase SQL editor to enable the fast path:
+#
+#   CREATE FUNCTION probe_perms() RETURNS jsonb AS $$
+#     SELECT jsonb_build_object(
+#       'select', has_table_privilege('menu_items', 'SELECT'),
+#       'insert', has_table_privilege('menu_items', 'INSERT'),
+#       'update', has_table_privilege('menu_items', 'UPDATE'),
+#       'delete', has_table_privilege('menu_items', 'DELETE'))
+#   $$ LANGUAGE sql STABLE;
+
+def probe_permissions():
+    """Ask the probe_perms() function for table privileges, None if it isn't installed"""
+    try:
+        result = supabase.rpc('probe_perms').execute()
+    except Exception as e:
+        print(f"ℹ️  probe_perms() not available ({e}) - falling back to test queries")
+        return None
+    
+    privileges = result.data or {}
+    for operation, allowed in privileges.items():
+        print(f"{'✅' if allowed else '❌'} {operation.upper()} permission: {'OK' if allowed else 'Failed'}")
+    return privileges
+
+def check_permissions(write_probe=False):
+    """Check what operations we can perform
+    
+    The INSERT check writes (and deletes) a test row, so it only runs with write_probe.
+    """
     print("\n🔐 Checking permissions...")
     
+    # One round-trip and no test row when the probe function exists
+    if probe_permissions() is not None:
+        return
+    
     try:
         # Test SELECT
         result = supabase.table('menu_items').select('id, name').limit(1).execute()
@@ -73,6 +106,10 @@ def check_permissions():
         else:
             print("❌ SELECT permission: Failed")
             
+        if not write_probe:
+            print("⏭️  INSERT permission: not checked (run with --write-probe to test with a throwaway row)")
+            return
+        
         # Test INSERT (create a test item)
         test_item = {
             'name': 'Test Item',
@@ -96,11 +133,17 @@ def check_permissions():
         print(f"❌ Permission check error: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Debug Supabase updates')
+    parser.add_argument('--write-probe', action='store_true',
+                        help='Check INSERT permission by writing and deleting a test row')
+    # parse_known_args so this still works when run through manage.py
+    args, _ = parser.parse_known_args()
+    
     print("🐛 Supabase Update Debug Tool")
     print("=" * 40)
     
     debug_single_update()
-    check_permissions()
+    check_permissions(write_probe=args.write_probe)
     
     print("\n" + "=" * 40)
 
@@ -11,130 +11,152 @@ import os
 import sys
 import requests
 import time
+from collections import Counter
 from datetime import datetime
 
 # Add the current directory to Python path
 sys.path.append('/Users/dinuthfernando/Documents/projects/green heaven')
 
 try:
-    from app import supabase, get_menu_items_from_supabase
+    from app import get_supabase, get_menu_items_from_supabase
+    from postgrest.types import ReturnMethod
+    supabase = get_supabase()
     print("✅ Successfully imported Supabase client")
 except Exception as e:
     print(f"❌ Error importing: {e}")
     sys.exit(1)
 
+# Rows per bulk upsert request
+UPSERT_BATCH_SIZE = 500
+
+MENU_IMAGE_URL = '/static/images/m.png'
+
+# Category mappings for proper organization, keyed by casefolded name
+VALID_CATEGORIES = frozenset(['Appetizers', 'Main Course', 'Desserts', 'Beverages'])
+CATEGORY_ALIASES = {
+    'appetizer': 'Appetizers',
+    'appetizers': 'Appetizers',
+    'main': 'Main Course',
+    'main course': 'Main Course',
+    'main_course': 'Main Course',
+    'dessert': 'Desserts',
+    'desserts': 'Desserts',
+    'beverage': 'Beverages',
+    'beverages': 'Beverages',
+    'drink': 'Beverages',
+    'drinks': 'Beverages'
+}
+
+def normalize_category(category):
+    """Map a stored category onto one of the valid categories"""
+    category = category or ''
+    if category in VALID_CATEGORIES:
+        return category
+    return CATEGORY_ALIASES.get(category.casefold(), 'Main Course')  # Default category
+
 def update_menu_images():
     """Update all menu items with m.png image and fix categories"""
     print("🔄 Starting comprehensive menu update...")
     
     try:
-        # Get current menu items
-        print("📊 Fetching current menu items...")
-        result = supabase.table('menu_items').select('*').execute()
+        # Get only the menu items that still need changes
+        print("📊 Fetching menu items that need updating...")
+        valid_categories = ','.join(f'"{category}"' for category in sorted(VALID_CATEGORIES))
+        result = supabase.table('menu_items').select('*').or_(
+            f'image_url.is.null,image_url.neq.{MENU_IMAGE_URL},'
+            f'category.is.null,category.not.in.({valid_categories})'
+        ).execute()
         
         if not result.data:
-            print("❌ No menu items found in database")
-            return False
+            print("✅ All menu items already use m.png and valid categories")
+            return True
             
         items = result.data
         print(f"📋 Found {len(items)} menu items to update")
         
-        # Define category mappings for proper organization
-        category_mappings = {
-            'Appetizer': 'Appetizers',
-            'appetizer': 'Appetizers', 
-            'appetizers': 'Appetizers',
-            'Main Course': 'Main Course',
-            'main': 'Main Course',
-            'main course': 'Main Course',
-            'main_course': 'Main Course',
-            'Dessert': 'Desserts',
-            'dessert': 'Desserts',
-            'desserts': 'Desserts',
-            'Beverage': 'Beverages',
-            'beverage': 'Beverages',
-            'beverages': 'Beverages',
-            'drink': 'Beverages',
-            'drinks': 'Beverages'
-        }
-        
         updated_count = 0
         failed_count = 0
         
+        # Normalize every item first, then send the changes in bulk
+        rows = []
         for item in items:
+            # Normalize category
+            normalized_category = normalize_category(item.get('category', ''))
+            
+            # Skip rows that are already correct
+            if item.get('image_url') == MENU_IMAGE_URL and item.get('category') == normalized_category:
+                continue
+            
+            # Set image URL; the full row is sent so the upsert never inserts partial data
+            rows.append({**item, 'image_url': MENU_IMAGE_URL, 'category': normalized_category})
+        
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
             try:
-                item_id = item['id']
-                current_image = item.get('image_url', '')
-                current_category = item.get('category', '')
-                
-                # Normalize category
-                normalized_category = category_mappings.get(current_category, current_category)
-                if not normalized_category or normalized_category not in ['Appetizers', 'Main Course', 'Desserts', 'Beverages']:
-                    normalized_category = 'Main Course'  # Default category
-                
-                # Set image URL
-                new_image_url = '/static/images/m.png'
-                
-                # Update the item
-                update_data = {
-                    'image_url': new_image_url,
-                    'category': normalized_category
-                }
-                
-                result = supabase.table('menu_items').update(update_data).eq('id', item_id).execute()
-                
-                if result.data:
-                    updated_count += 1
-                    print(f"✅ Updated {item['name']}: {normalized_category} - {new_image_url}")
-                else:
-                    failed_count += 1
-                    print(f"❌ Failed to update {item['name']}")
-                    
+                # One statement per batch, so it either fully applies or raises;
+                # skip echoing the rows back
+                supabase.table('menu_items').upsert(
+                    batch, on_conflict='id', returning=ReturnMethod.minimal
+                ).execute()
             except Exception as e:
-                failed_count += 1
-                print(f"❌ Error updating {item.get('name', 'unknown')}: {e}")
+                failed_count += len(batch)
+                print(f"❌ Error updating batch of {len(batch)} items: {e}")
+                print("❌ Failed to update: " + ", ".join(row.get('name', 'unknown') for row in batch))
+                continue
+            
+            # Report once per batch rather than once per row
+            updated_count += len(batch)
+            print(f"✅ Updated {updated_count}/{len(rows)} items")
                 
         print(f"\n📊 Update Summary:")
         print(f"   ✅ Successfully updated: {updated_count}")
         print(f"   ❌ Failed updates: {failed_count}")
         
-        return updated_count > 0
+        return failed_count == 0
         
     except Exception as e:
         print(f"❌ Error in update_menu_images: {e}")
         return False
 
+def count_image_updates():
+    """Count (items with m.png, all items) without fetching any rows' data"""
+    total = supabase.table('menu_items').select('id', count='exact').limit(1).execute().count
+    updated = supabase.table('menu_items').select('id', count='exact').like('image_url', '%m.png%').limit(1).execute().count
+    return updated or 0, total or 0
+
+def wait_for_image_updates():
+    """Poll with a short backoff until every item reports the m.png image"""
+    updated, total = 0, 0
+    for delay in (0.1, 0.2, 0.4, 0.8):
+        try:
+            updated, total = count_image_updates()
+            if total and updated == total:
+                break
+        except Exception as e:
+            print(f"⚠️ Update check failed: {e}")
+        time.sleep(delay)
+    return updated, total
+
 def verify_updates():
     """Verify that the updates were successful"""
     print("\n🔍 Verifying updates...")
     
     try:
-        # Wait a moment for database to propagate changes
-        time.sleep(2)
-        
-        # Get updated items directly from database
-        result = supabase.table('menu_items').select('*').execute()
+        # Writes are visible as soon as PostgREST returns; only poll briefly
+        # in case a read replica is still catching up
+        correct_images, total_items = wait_for_image_updates()
         
-        if not result.data:
+        if not total_items:
             print("❌ No items found during verification")
             return False
-            
-        items = result.data
-        correct_images = 0
-        category_counts = {}
         
-        print(f"📋 Verifying {len(items)} items...")
+        print(f"📋 Verifying {total_items} items...")
         
-        for item in items:
-            image_url = item.get('image_url', '')
-            category = item.get('category', '')
-            
-            if 'm.png' in image_url:
-                correct_images += 1
-                
-            category_counts[category] = category_counts.get(category, 0) + 1
+        # Image totals come from the count queries; only categories are fetched
+        result = supabase.table('menu_items').select('category').execute()
+        category_counts = dict(Counter(item.get('category', '') for item in (result.data or [])))
         
-        print(f"\n📸 Images with m.png: {correct_images}/{len(items)}")
+        print(f"\n📸 Images with m.png: {correct_images}/{total_items}")
         print(f"📊 Category distribution: {category_counts}")
         
         # Test the API endpoint
@@ -163,7 +185,7 @@ def verify_updates():
         except Exception as e:
             print(f"❌ API test error: {e}")
             
-        return correct_images == len(items)
+        return correct_images == total_items
         
     except Exception as e:
         print(f"❌ Error in verify_updates: {e}")
@@ -177,7 +199,8 @@ def main():
     # Check if server is running
     print("🔌 Checking if server is running...")
     try:
-        response = requests.get('http://localhost:5001/api/menu', timeout=5)
+        # Short connect timeout so a stopped server fails fast
+        response = requests.get('http://localhost:5001/api/menu', timeout=(0.3, 5))
         print(f"✅ Server is running (status: {response.status_code})")
     except:
         print("⚠️ Server may not be running - continuing with database updates")
@@ -6,90 +6,162 @@ Script to update all menu items with proper images and fix categories
 import sys
 import os
 import json
+import argparse
+from collections import defaultdict
 from datetime import datetime
 
 # Add current directory to path to import app modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import from the main app
-from app import supabase, get_menu_items_from_supabase, save_menu_item_to_supabase
+from app import get_supabase, get_menu_items_from_supabase, save_menu_item_to_supabase, write_file_atomically
+from postgrest.types import ReturnMethod
+supabase = get_supabase()
+
+# Rows per bulk upsert request
+UPSERT_BATCH_SIZE = 500
+
+# Common category variations, keyed by casefolded name
+VALID_CATEGORIES = frozenset(['Appetizers', 'Main Course', 'Sri Lankan Specials', 'Desserts', 'Beverages'])
+CATEGORY_ALIASES = {
+    'appetizer': 'Appetizers',
+    'appetizers': 'Appetizers',
+    'main': 'Main Course',
+    'main course': 'Main Course',
+    'mains': 'Main Course',
+    'sri lankan': 'Sri Lankan Specials',
+    'sri lankan special': 'Sri Lankan Specials',
+    'dessert': 'Desserts',
+    'desserts': 'Desserts',
+    'beverage': 'Beverages',
+    'beverages': 'Beverages',
+    'drinks': 'Beverages',
+    'drink': 'Beverages'
+}
+
+def normalize_category(category):
+    """Map a stored category onto one of the valid categories"""
+    category = category or ''
+    if category in VALID_CATEGORIES:
+        return category
+    return CATEGORY_ALIASES.get(category.casefold(), 'Main Course')
+
+def normalize_menu_sql():
+    """SQL for the optional normalize_menu() function - same rules as normalize_category"""
+    valid = ', '.join(f"'{category}'" for category in sorted(VALID_CATEGORIES))
+    aliases = '\n'.join(f"                    WHEN '{alias}' THEN '{category}'" for alias, category in CATEGORY_ALIASES.items())
+    return f"""CREATE FUNCTION normalize_menu() RETURNS integer AS $$
+    WITH updated AS (
+        UPDATE menu_items SET
+            image_url = '/static/images/m.png',
+            category = CASE
+                WHEN category IN ({valid}) THEN category
+                ELSE CASE lower(category)
+{aliases}
+                    ELSE 'Main Course'
+                END
+            END
+        WHERE image_url IS DISTINCT FROM '/static/images/m.png'
+           OR category IS NULL OR category NOT IN ({valid})
+        RETURNING 1
+    )
+    SELECT count(*)::integer FROM updated
+$$ LANGUAGE sql SET synchronous_commit = off;"""
+
+def normalize_menu_on_server(show_sql=False):
+    """Run normalize_menu() in Postgres, returns rows updated or None if it isn't installed"""
+    try:
+        result = supabase.rpc('normalize_menu').execute()
+    except Exception as e:
+        print(f"ℹ️  normalize_menu() not available ({e}) - updating rows from here")
+        if show_sql:
+            print("💡 Create it in the Supabase SQL editor to do this in one call:")
+            print(normalize_menu_sql())
+        else:
+            print("💡 Run with --show-sql for a function that does this in one call")
+        return None
+    return result.data
 
 def print_section(title):
     print("\n" + "="*60)
     print(f" {title}")
     print("="*60)
 
-def update_menu_images():
-    """Update all menu items to use the m.png image"""
+def update_menu_images(current_items, show_sql=False):
+    """Update all menu items to use the m.png image
+    
+    Items in current_items are only changed once their update is saved.
+    """
     print_section("Updating Menu Item Images")
     
-    # Get current menu items
-    current_items = get_menu_items_from_supabase()
     if not current_items:
         print("❌ No menu items found in Supabase")
         return
     
     print(f"📊 Found {len(current_items)} menu items")
     
-    # Update each item with the new image
+    # Normalize a copy of each item, then send only the changed ones in bulk
     updated_count = 0
+    changed_items = []
     for item in current_items:
-        # Update image URL to use m.png
-        item['image_url'] = '/static/images/m.png'
-        
         # Ensure proper category formatting
-        category = item.get('category', 'Main Course')
-        if category not in ['Appetizers', 'Main Course', 'Sri Lankan Specials', 'Desserts', 'Beverages']:
-            # Map common variations
-            category_mapping = {
-                'appetizer': 'Appetizers',
-                'appetizers': 'Appetizers',
-                'main': 'Main Course',
-                'main course': 'Main Course',
-                'mains': 'Main Course',
-                'sri lankan': 'Sri Lankan Specials',
-                'sri lankan special': 'Sri Lankan Specials',
-                'dessert': 'Desserts',
-                'desserts': 'Desserts',
-                'beverage': 'Beverages',
-                'beverages': 'Beverages',
-                'drinks': 'Beverages',
-                'drink': 'Beverages'
-            }
-            category = category_mapping.get(category.lower(), 'Main Course')
+        category = normalize_category(item.get('category', 'Main Course'))
         
-        item['category'] = category
+        # Skip items that already use m.png and a proper category
+        if item.get('image_url') == '/static/images/m.png' and item.get('category') == category:
+            continue
         
+        # Update image URL to use m.png
+        changed_items.append((item, {**item, 'image_url': '/static/images/m.png', 'category': category}))
+    
+    print(f"⏭️  {len(current_items) - len(changed_items)} items already up to date")
+    
+    if not changed_items:
+        return
+    
+    # One server-side UPDATE when the function is installed
+    server_count = normalize_menu_on_server(show_sql)
+    if server_count is not None:
+        for item, row in changed_items:
+            item.update(row)
+        print(f"\n✅ Successfully updated {server_count} menu items")
+        return
+    
+    for start in range(0, len(changed_items), UPSERT_BATCH_SIZE):
+        batch = changed_items[start:start + UPSERT_BATCH_SIZE]
         try:
-            # Update in Supabase
-            result = supabase.table('menu_items').update({
-                'image_url': item['image_url'],
-                'category': item['category']
-            }).eq('id', item['id']).execute()
-            
-            print(f"✅ Updated: {item['name']} -> {category}")
-            updated_count += 1
-            
+            # Update in Supabase - full rows so the upsert never inserts partial data.
+            # A batch is one statement that either applies or raises, so the rows
+            # don't need echoing back
+            supabase.table('menu_items').upsert(
+                [row for _, row in batch], on_conflict='id', returning=ReturnMethod.minimal
+            ).execute()
         except Exception as e:
-            print(f"❌ Failed to update {item['name']}: {e}")
+            print(f"❌ Failed to update batch of {len(batch)} items: {e}")
+            print("❌ Failed to update: " + ", ".join(item['name'] for item, _ in batch))
+            continue
+        
+        # Saved - later steps can now see the new image and category
+        for item, row in batch:
+            item.update(row)
+        
+        # Report once per batch rather than once per item
+        updated_count += len(batch)
+        print(f"✅ Updated {updated_count}/{len(changed_items)} items")
     
     print(f"\n✅ Successfully updated {updated_count} menu items")
 
-def verify_categories():
+def verify_categories(current_items):
     """Verify that all menu items have proper categories"""
     print_section("Verifying Menu Categories")
     
-    current_items = get_menu_items_from_supabase()
     if not current_items:
         print("❌ No menu items found")
         return
     
-    categories = {}
+    categories = defaultdict(list)
     for item in current_items:
-        category = item.get('category', 'Unknown')
-        if category not in categories:
-            categories[category] = []
-        categories[category].append(item['name'])
+        categories[item.get('category', 'Unknown')].append(item['name'])
     
     print("📊 Menu Items by Category:")
     for category, items in categories.items():
@@ -99,8 +171,8 @@ def verify_categories():
         if len(items) > 5:
             print(f"   ... and {len(items) - 5} more")
 
-def create_sample_menu_with_images():
-    """Create sample menu items with proper images if none exist"""
+def create_sample_menu_with_images(current_items):
+    """Create sample menu items with proper images if none exist (adds them to current_items)"""
     print_section("Creating Sample Menu Items")
     
     sample_items = [
@@ -178,37 +250,43 @@ def create_sample_menu_with_images():
         }
     ]
     
-    current_items = get_menu_items_from_supabase()
-    current_count = len(current_items) if current_items else 0
+    current_count = len(current_items)
     
     if current_count < 10:
         print(f"Adding sample items to reach better variety (current: {current_count})")
         
+        try:
+            # Add all samples in one request
+            result = supabase.table('menu_items').upsert(sample_items, on_conflict='id').execute()
+            added_ids = {row.get('id') for row in (result.data or [])}
+        except Exception as e:
+            print(f"❌ Failed to add sample items: {e}")
+            added_ids = set()
+        
+        # Keep the in-memory menu in step with the database
+        positions = {item['id']: index for index, item in enumerate(current_items)}
         for item in sample_items:
-            try:
-                result = supabase.table('menu_items').upsert(item).execute()
+            if item['id'] in added_ids:
                 print(f"✅ Added: {item['name']}")
-            except Exception as e:
-                print(f"❌ Failed to add {item['name']}: {e}")
+                if item['id'] in positions:
+                    current_items[positions[item['id']]] = dict(item)
+                else:
+                    current_items.append(dict(item))
+            else:
+                print(f"❌ Failed to add {item['name']}")
     else:
         print(f"✅ Menu already has {current_count} items - no need to add samples")
 
-def fix_menu_filtering():
+def fix_menu_filtering(current_items):
     """Update the customer page to have better filtering"""
     print_section("Fixing Menu Filtering")
     
     # Get all unique categories from current menu
-    current_items = get_menu_items_from_supabase()
     if not current_items:
         print("❌ No menu items found")
         return
     
-    categories = set()
-    for item in current_items:
-        category = item.get('category', 'Main Course')
-        categories.add(category)
-    
-    categories = sorted(list(categories))
+    categories = sorted({item.get('category', 'Main Course') for item in current_items})
     print(f"📊 Found categories: {', '.join(categories)}")
     
     # Update the customer page HTML with dynamic categories
@@ -224,17 +302,27 @@ def fix_menu_filtering():
         
         new_categories_html = '\n            '.join(category_buttons)
         
-        # Replace the menu categories section
-        import re
-        pattern = r'<div class="menu-categories">(.*?)</div>'
-        replacement = f'''<div class="menu-categories">
-            {new_categories_html}
-        </div>'''
+        # Replace the menu categories section by splicing between its tags
+        opening_tag = '<div class="menu-categories">'
+        start = content.find(opening_tag)
+        end = content.find('</div>', start) if start != -1 else -1
+        if end == -1:
+            print(f"❌ Menu categories section not found in {customer_html_path}")
+            return
         
-        updated_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+        updated_content = (
+            content[:start + len(opening_tag)]
+            + f"\n            {new_categories_html}\n        "
+            + content[end:]
+        )
         
-        with open(customer_html_path, 'w') as f:
-            f.write(updated_content)
+        # Leave the file (and the reloader) alone when nothing would change
+        if updated_content == content:
+            print(f"⏭️  Menu categories in {customer_html_path} already up to date")
+            return
+        
+        # Never leave a half-written template behind
+        write_file_atomically(customer_html_path, updated_content)
         
         print(f"✅ Updated menu categories in {customer_html_path}")
         
@@ -242,6 +330,12 @@ def fix_menu_filtering():
         print(f"❌ Failed to update customer page: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Update menu images and fix categories')
+    parser.add_argument('--show-sql', action='store_true',
+                        help='print the normalize_menu() SQL when the function is not installed')
+    # parse_known_args so this still works when run through manage.py
+    args, _ = parser.parse_known_args()
+    
     print("🍽️  Green Heaven Menu Image & Filter Fix")
     print(f"🕒 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -249,17 +343,20 @@ def main():
         print("❌ Supabase not available - cannot update menu")
         return
     
+    # Read the menu once; each step below works on (and updates) this list
+    current_items = get_menu_items_from_supabase() or []
+    
     # Step 1: Update all menu images
-    update_menu_images()
+    update_menu_images(current_items, show_sql=args.show_sql)
     
     # Step 2: Add sample items if needed
-    create_sample_menu_with_images()
+    create_sample_menu_with_images(current_items)
     
     # Step 3: Verify categories
-    verify_categories()
+    verify_categories(current_items)
     
     # Step 4: Fix menu filtering
-    fix_menu_filtering()
+    fix_menu_filtering(current_items)
     
     print_section("Menu Fix Complete")
     print("✅ All menu items now use m.png image")
@@ -7,6 +7,7 @@ Diagnoses and fixes Supabase SSL connection issues with Python 3.13+
 import os
 import sys
 import ssl
+import functools
 import urllib.request
 import json
 from datetime import datetime
@@ -39,26 +40,29 @@ def test_ssl_connection():
     return True
 
 def fix_ssl_environment():
-    """Apply SSL environment fixes for Python 3.13+"""
+    """Point Python's SSL stack at an up-to-date CA bundle (verification stays on)"""
     print("🔧 Applying SSL environment fixes...")
     
-    # Set environment variables for SSL compatibility
-    ssl_fixes = {
-        'PYTHONHTTPSVERIFY': '0',  # Disable SSL verification as fallback
-        'CURL_CA_BUNDLE': '',      # Clear CA bundle to use system default
-        'REQUESTS_CA_BUNDLE': '',  # Clear requests CA bundle
-    }
+    try:
+        import certifi
+    except ImportError:
+        print("  ⚠️ certifi not installed - run: pip install certifi")
+        return None
     
-    for key, value in ssl_fixes.items():
-        os.environ[key] = value
-        print(f"  Set {key}={value}")
+    # Use certifi's CA bundle instead of a stale system one
+    ca_bundle = certifi.where()
+    for key in ('SSL_CERT_FILE', 'REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE'):
+        os.environ[key] = ca_bundle
+        print(f"  Set {key}={ca_bundle}")
     
-    # Configure SSL context globally
+    # Configure SSL context globally - still verified, just against the same bundle
     try:
-        ssl._create_default_https_context = ssl._create_unverified_context
+        ssl._create_default_https_context = functools.partial(ssl.create_default_context, cafile=ca_bundle)
         print("  ✅ Applied global SSL context fix")
     except Exception as e:
         print(f"  ⚠️ Global SSL context fix failed: {e}")
+    
+    return ca_bundle
 
 def test_supabase_connection():
     """Test Supabase connection with different methods"""
@@ -104,9 +108,9 @@ import ssl
 import os
 import sys
 
-# Apply SSL fixes
-os.environ['PYTHONHTTPSVERIFY'] = '0'
-ssl._create_default_https_context = ssl._create_unverified_context
+# Apply SSL fixes - verify against certifi's CA bundle
+import certifi
+os.environ['SSL_CERT_FILE'] = certifi.where()
 
 # Test Supabase
 try:
@@ -117,7 +121,7 @@ try:
     
     if supabase_url and supabase_key:
         client = create_client(supabase_url, supabase_key)
-        result = client.table('menu_items').select('*').limit(1).execute()
+        result = client.table('menu_items').select('id, name').limit(1).execute()
         print("✅ Supabase connection works!")
         print(f"Test result: {result.data}")
     else:
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Green Heaven Restaurant System - Maintenance Commands
+Runs one or more maintenance scripts in a single process so the app
+(and its Supabase client) is only imported once
+
+Usage:
+    python manage.py fix-menu-complete fix-menu-images
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from datetime import datetime
+
+# Add current directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Command name -> module providing main()
+COMMANDS = {
+    'debug-supabase': 'debug_supabase',
+    'fix-menu-complete': 'fix_menu_complete',
+    'fix-menu-images': 'fix_menu_images',
+    'fix-ssl': 'fix_ssl_connection',
+}
+
+def main():
+    parser = argparse.ArgumentParser(description='Green Heaven maintenance commands')
+    parser.add_argument('commands', nargs='+', choices=sorted(COMMANDS),
+                        help='commands to run, in order')
+    args = parser.parse_args()
+
+    for command in args.commands:
+        print(f"\n▶️  Running {command} at {datetime.now().strftime('%H:%M:%S')}")
+        # Modules are imported on demand; app.py is only executed by the first one that needs it
+        module = importlib.import_module(COMMANDS[command])
+        module.main()
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,10 @@ import json
 from datetime import datetime
 
 def check_environment():
-    """Check production environment configuration"""
+    """Check production environment configuration
+    
+    Returns the menu rows fetched from Supabase, or None if the check failed
+    """
     print("🔍 Green Heaven Production Environment Check")
     print("=" * 60)
     print(f"🕐 Timestamp: {datetime.now().isoformat()}")
@@ -67,31 +70,26 @@ def check_environment():
         
         if not supabase_url or not supabase_key:
             print("  ❌ Supabase credentials missing")
-            return False
+            return None
         
         print(f"  🔄 Connecting to: {supabase_url[:50]}...")
         
-        # Try connection
+        # Try connection - one query covers both the probe and the menu summary
         client = create_client(supabase_url, supabase_key)
-        result = client.table('menu_items').select('id').limit(1).execute()
+        result = client.table('menu_items').select('id,category,name').execute()
         
         if result.data:
             print(f"  ✅ Connection successful!")
-            
-            # Get full menu count
-            full_result = client.table('menu_items').select('*').execute()
-            print(f"  📊 Total menu items: {len(full_result.data)}")
+            print(f"  📊 Total menu items: {len(result.data)}")
             
             # Show categories
-            categories = set()
-            for item in full_result.data:
-                categories.add(item.get('category', 'Unknown'))
+            categories = {item.get('category') or 'Unknown' for item in result.data}
             print(f"  🏷️ Categories: {', '.join(sorted(categories))}")
             
-            return True
+            return result.data
         else:
             print("  ⚠️ Connection successful but no data returned")
-            return False
+            return None
             
     except Exception as e:
         print(f"  ❌ Connection failed: {e}")
@@ -106,24 +104,30 @@ def check_environment():
         elif "authentication" in error_str.lower():
             print("  🔑 Authentication issue - check API keys")
         
-        return False
+        return None
 
-def test_flask_app():
-    """Test if Flask app can start"""
+def test_flask_app(menu_items=None):
+    """Test if Flask app can start
+    
+    menu_items are the rows already fetched by check_environment; the app's own
+    menu is loaded once at import, so nothing is fetched from Supabase again
+    """
     print("🧪 Testing Flask Application:")
     try:
         # Import main app components
-        from app import app, supabase, load_menu_items
+        from app import app, supabase, menu_by_id
         
         print("  ✅ App imports successful")
         print(f"  🔗 Supabase client: {'Available' if supabase else 'Not available'}")
         
-        # Test menu loading
-        menu_items = load_menu_items()
-        print(f"  📋 Menu items loaded: {len(menu_items)}")
+        # Check the menu the app loaded at import
+        app_menu = list(menu_by_id.values())
+        print(f"  📋 Menu items loaded: {len(app_menu)}")
+        if menu_items is not None and len(menu_items) != len(app_menu):
+            print(f"  ⚠️ Supabase returned {len(menu_items)} items but the app loaded {len(app_menu)}")
         
-        if menu_items:
-            sample_item = menu_items[0]
+        if app_menu:
+            sample_item = app_menu[0]
             if sample_item.get('id') == 'emergency-item-1':
                 print("  ⚠️ WARNING: Using emergency fallback menu!")
                 print("  🚨 Supabase connection is failing in production")
@@ -175,10 +179,11 @@ def generate_fix_recommendations():
 
 def main():
     """Main diagnostic function"""
-    env_ok = check_environment()
+    menu_rows = check_environment()
+    env_ok = bool(menu_rows)
     print()
     
-    app_ok = test_flask_app()
+    app_ok = test_flask_app(menu_items=menu_rows)
     print()
     
     if not env_ok or not app_ok:
@@ -7,12 +7,20 @@ Downloads actual food photos that match the exact food names
 import os
 import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import uuid
 import time
 from io import BytesIO
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 import hashlib
 import json
+import re
+import tempfile
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
 # Add project root to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -25,7 +33,127 @@ except ImportError:
     print("❌ Required packages not installed. Please install: supabase python-dotenv pillow")
     sys.exit(1)
 
+# Food name mappings for better results
+FOOD_MAPPINGS = {
+    'tom yum': 'tom yum soup',
+    'kottu': 'kottu roti',
+    'hoppers': 'egg hoppers',
+    'pol sambol': 'coconut sambol',
+    'papadum': 'papadam',
+    'biriyani': 'biryani',
+    'nasi goreng': 'indonesian fried rice',
+    'mongolian fried rice': 'mongolian rice',
+    'chopsuey': 'chop suey',
+    'devilled': 'spicy',
+    'cutlets': 'fish cutlets',
+    'prawns': 'shrimp',
+    'cuttlefish': 'squid',
+    'mullet': 'mullet fish'
+}
+FOOD_MAPPINGS_RE = re.compile('|'.join(re.escape(key) for key in FOOD_MAPPINGS))
+
+# Map food names to Foodish categories
+FOODISH_CATEGORY_MAPPING = {
+    'rice': 'rice',
+    'fried rice': 'rice',
+    'biryani': 'biryani',
+    'biriyani': 'biryani',
+    'pasta': 'pasta',
+    'spaghetti': 'pasta',
+    'burger': 'burger',
+    'sandwich': 'burger',
+    'chicken': 'butter-chicken',
+    'curry': 'butter-chicken',
+    'dessert': 'dessert',
+    'sweet': 'dessert'
+}
+FOODISH_CATEGORY_RE = re.compile('|'.join(re.escape(key) for key in FOODISH_CATEGORY_MAPPING))
+
+# Anything but letters, digits, spaces, dashes and underscores is dropped from filenames
+UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w \-]')
+
+@functools.lru_cache(maxsize=1024)
+def clean_food_name(food_name):
+    """Clean and optimize food name for better search results"""
+    # Remove portion indicators
+    cleaned = food_name.replace(" (Full)", "").replace(" (Half)", "")
+    
+    # Remove restaurant specific terms
+    cleaned = cleaned.replace(" - Green Heaven", "")
+    cleaned = cleaned.replace("Green Heaven", "")
+    
+    # Extract main food item (before dash or comma)
+    if " - " in cleaned:
+        cleaned = cleaned.split(" - ")[0]
+    if "," in cleaned:
+        cleaned = cleaned.split(",")[0]
+    
+    # Clean up common terms
+    cleaned = cleaned.replace("and", "&")
+    cleaned = cleaned.replace("with", "")
+    
+    # One scan for any mapped name instead of testing each key in turn
+    match = FOOD_MAPPINGS_RE.search(cleaned.lower().strip())
+    if match:
+        cleaned = FOOD_MAPPINGS[match.group(0)]
+    
+    return cleaned.strip()
+
+class HostRateLimiter:
+    """Spaces out requests to each host, shared by all worker threads
+    
+    Hosts start at min_interval; each 429 doubles that host's gap (up to
+    max_interval) and each other response halves it back down, so hosts that
+    never throttle us never cost any idle time.
+    """
+    
+    # Gap used for a host's first 429 when min_interval is zero
+    BACKOFF_START = 0.5
+    
+    def __init__(self, min_interval, max_interval=8.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lock = threading.Lock()
+        self.next_allowed = {}
+        self.intervals = {}
+    
+    def wait(self, url):
+        """Block until a request to url's host is allowed"""
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_allowed.get(host, now))
+            self.next_allowed[host] = slot + self.intervals.get(host, self.min_interval)
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def record(self, url, status_code):
+        """Adapt url's host gap to the response it gave"""
+        host = urlparse(url).netloc
+        with self.lock:
+            interval = self.intervals.get(host, self.min_interval)
+            if status_code == 429:
+                interval = min(self.max_interval, max(interval * 2, self.BACKOFF_START))
+            elif interval > self.min_interval:
+                interval /= 2
+                if interval < self.BACKOFF_START:
+                    interval = self.min_interval
+            self.intervals[host] = interval
+
 class RealFoodPhotoDownloader:
+    # Photo formats worth identifying; skips probing every other PIL plugin
+    IMAGE_FORMATS = ('JPEG', 'PNG', 'WEBP')
+    # Minimum gap between requests to the same photo host, in seconds; it only
+    # grows for hosts that answer 429
+    HOST_REQUEST_INTERVAL = 0.0
+    # Threads shared by all items for querying the food photo sources concurrently
+    SOURCE_WORKERS = 24
+    # Menu rows saved per bulk upsert once their photos are uploaded
+    UPDATE_BATCH_SIZE = 100
+    # Downloaded photos, keyed by cleaned food name, reused across runs
+    IMAGE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.image_cache')
+    
     def __init__(self):
         """Initialize Supabase connection and photo sources"""
         self.supabase_url = os.getenv('SUPABASE_URL')
@@ -42,6 +170,26 @@ class RealFoodPhotoDownloader:
             print(f"❌ Failed to connect to Supabase: {e}")
             sys.exit(1)
         
+        # Per-host rate limiting, so parallel workers stay polite to each API
+        self.rate_limiter = HostRateLimiter(self.HOST_REQUEST_INTERVAL)
+        self.source_executor = ThreadPoolExecutor(max_workers=self.SOURCE_WORKERS)
+        
+        # The storage call doesn't depend on the menu query, so let it run
+        # while the menu loads; process_all_items waits for it before uploading
+        self.bucket_future = self.source_executor.submit(self.ensure_bucket)
+        
+        # One pooled HTTP session so each photo host keeps its connection alive
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504],
+                              respect_retry_after_header=True)
+        )
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+        self.http.headers.update({'User-Agent': 'green-heaven/1.0'})
+        
         # Photo sources with real food APIs
         self.photo_sources = {
             'unsplash': {
@@ -65,100 +213,61 @@ class RealFoodPhotoDownloader:
     
     def clean_food_name_for_search(self, food_name):
         """Clean and optimize food name for better search results"""
-        # Remove portion indicators
-        cleaned = food_name.replace(" (Full)", "").replace(" (Half)", "")
-        
-        # Remove restaurant specific terms
-        cleaned = cleaned.replace(" - Green Heaven", "")
-        cleaned = cleaned.replace("Green Heaven", "")
-        
-        # Extract main food item (before dash or comma)
-        if " - " in cleaned:
-            cleaned = cleaned.split(" - ")[0]
-        if "," in cleaned:
-            cleaned = cleaned.split(",")[0]
-        
-        # Clean up common terms
-        cleaned = cleaned.replace("and", "&")
-        cleaned = cleaned.replace("with", "")
+        return clean_food_name(food_name)
+    
+    def fetch_valid_image(self, url, timeout):
+        """Download url if it is a usable photo, returning its bytes or None
         
-        # Food name mappings for better results
-        food_mappings = {
-            'tom yum': 'tom yum soup',
-            'kottu': 'kottu roti',
-            'hoppers': 'egg hoppers',
-            'pol sambol': 'coconut sambol',
-            'papadum': 'papadam',
-            'biriyani': 'biryani',
-            'nasi goreng': 'indonesian fried rice',
-            'mongolian fried rice': 'mongolian rice',
-            'chopsuey': 'chop suey',
-            'devilled': 'spicy',
-            'cutlets': 'fish cutlets',
-            'prawns': 'shrimp',
-            'cuttlefish': 'squid',
-            'mullet': 'mullet fish'
-        }
+        Status, Content-Type and Content-Length are checked before the body is
+        read, so rejected candidates cost only their headers. PIL then parses
+        just the image header (no pixel decode) to check mode and width.
+        """
+        self.rate_limiter.wait(url)
+        with self.http.get(url, timeout=timeout, allow_redirects=True, stream=True) as response:
+            self.rate_limiter.record(url, response.status_code)
+            content_type = response.headers.get('Content-Type', '')
+            content_length = int(response.headers.get('Content-Length') or 0)
+            if (response.status_code != 200 or not content_type.startswith('image/')
+                    or (content_length and content_length <= 5000)):
+                print(f"    ❌ Bad response: {response.status_code}, type: {content_type or 'unknown'}, size: {content_length}")
+                return None
+            content = response.content
         
-        cleaned_lower = cleaned.lower().strip()
-        for key, value in food_mappings.items():
-            if key in cleaned_lower:
-                cleaned = value
-                break
+        if len(content) <= 5000:
+            print(f"    ❌ Bad response: {response.status_code}, size: {len(content)}")
+            return None
         
-        return cleaned.strip()
+        # Image.open is lazy - it reads the header but doesn't decode pixels,
+        # and mode/size come from that header
+        try:
+            img = Image.open(BytesIO(content), formats=self.IMAGE_FORMATS)
+        except (UnidentifiedImageError, SyntaxError) as img_error:
+            print(f"    ❌ Invalid image format: {img_error}")
+            return None
+        if img.mode in ('RGB', 'RGBA') and img.size[0] >= 300:
+            return content
+        return None
     
     def search_unsplash_food_image(self, food_name):
         """Search for real food images on Unsplash"""
         try:
             cleaned_name = self.clean_food_name_for_search(food_name)
             
-            # Try different search terms
-            search_terms = [
-                f"{cleaned_name}",
-                f"{cleaned_name} food",
-                f"{cleaned_name} dish"
-            ]
+            # The featured endpoint broadens the query server-side, so one
+            # request is enough; on failure we fall through to the next source
+            search_query = cleaned_name.replace(' ', '+').replace('&', 'and')
+            url = f"https://source.unsplash.com/featured/400x300/?{search_query}"
             
-            for term in search_terms:
-                try:
-                    # Use a more direct approach with specific food image sources
-                    search_query = term.replace(' ', '+').replace('&', 'and')
-                    
-                    # Try Unsplash with specific dimensions and query
-                    urls_to_try = [
-                        f"https://source.unsplash.com/featured/400x300/?{search_query}",
-                        f"https://source.unsplash.com/400x300/?food+{search_query}",
-                        f"https://source.unsplash.com/400x300/?{search_query}+meal"
-                    ]
-                    
-                    for url in urls_to_try:
-                        try:
-                            print(f"    Trying: {url}")
-                            response = requests.get(url, timeout=20, allow_redirects=True)
-                            
-                            if response.status_code == 200 and len(response.content) > 5000:
-                                # Verify it's actually an image
-                                try:
-                                    img = Image.open(BytesIO(response.content))
-                                    if img.mode in ('RGB', 'RGBA') and img.size[0] >= 300:
-                                        print(f"  ✅ Found real food image via Unsplash: {term}")
-                                        return BytesIO(response.content)
-                                except Exception as img_error:
-                                    print(f"    ❌ Invalid image format: {img_error}")
-                                    continue
-                            else:
-                                print(f"    ❌ Bad response: {response.status_code}, size: {len(response.content)}")
-                            
-                            time.sleep(1)  # Rate limiting
-                            
-                        except Exception as url_error:
-                            print(f"    ❌ URL failed: {url_error}")
-                            continue
-                    
-                except Exception as term_error:
-                    print(f"  ⚠️ Search term failed '{term}': {term_error}")
-                    continue
+            print(f"    Trying: {url}")
+            try:
+                image_data = self.fetch_valid_image(url, timeout=20)
+            except Exception as img_error:
+                print(f"    ❌ Invalid image format: {img_error}")
+                return None
+            
+            if image_data:
+                print(f"  ✅ Found real food image via Unsplash: {cleaned_name}")
+                return image_data
             
             return None
             
@@ -177,43 +286,28 @@ class RealFoodPhotoDownloader:
             
             cleaned_name = self.clean_food_name_for_search(food_name).lower()
             
-            # Map food names to Foodish categories
-            category_mapping = {
-                'rice': 'rice',
-                'fried rice': 'rice',
-                'biryani': 'biryani',
-                'biriyani': 'biryani',
-                'pasta': 'pasta',
-                'spaghetti': 'pasta',
-                'burger': 'burger',
-                'sandwich': 'burger',
-                'chicken': 'butter-chicken',
-                'curry': 'butter-chicken',
-                'dessert': 'dessert',
-                'sweet': 'dessert'
-            }
-            
             # Find matching category
-            category = None
-            for key, cat in category_mapping.items():
-                if key in cleaned_name:
-                    category = cat
-                    break
+            match = FOODISH_CATEGORY_RE.search(cleaned_name)
+            category = FOODISH_CATEGORY_MAPPING[match.group(0)] if match else None
             
             if category:
                 try:
                     url = f"https://foodish-api.herokuapp.com/api/images/{category}"
-                    response = requests.get(url, timeout=10)
+                    self.rate_limiter.wait(url)
+                    response = self.http.get(url, timeout=10)
+                    self.rate_limiter.record(url, response.status_code)
                     
                     if response.status_code == 200:
                         data = response.json()
                         image_url = data.get('image')
                         
                         if image_url:
-                            img_response = requests.get(image_url, timeout=15)
+                            self.rate_limiter.wait(image_url)
+                            img_response = self.http.get(image_url, timeout=15)
+                            self.rate_limiter.record(image_url, img_response.status_code)
                             if img_response.status_code == 200:
                                 print(f"  ✅ Found image via Foodish API: {category}")
-                                return BytesIO(img_response.content)
+                                return img_response.content
                                 
                 except Exception as e:
                     print(f"  ⚠️ Foodish API failed: {e}")
@@ -227,8 +321,9 @@ class RealFoodPhotoDownloader:
     def search_picsum_food_image(self, food_name):
         """Get food-themed images from Lorem Picsum"""
         try:
-            # Generate a consistent seed based on food name
-            food_seed = abs(hash(food_name)) % 1000
+            # Generate a consistent seed based on food name - builtin hash() is
+            # salted per process, so use a digest that is stable across runs
+            food_seed = int(hashlib.blake2b(food_name.encode(), digest_size=4).hexdigest(), 16) % 10000
             
             # Try different Picsum endpoints
             urls_to_try = [
@@ -240,19 +335,14 @@ class RealFoodPhotoDownloader:
             for url in urls_to_try:
                 try:
                     print(f"    Trying Picsum: {url}")
-                    response = requests.get(url, timeout=15, allow_redirects=True)
-                    
-                    if response.status_code == 200 and len(response.content) > 5000:
-                        # Verify it's a valid image
-                        try:
-                            img = Image.open(BytesIO(response.content))
-                            if img.mode in ('RGB', 'RGBA') and img.size[0] >= 300:
-                                print(f"  ✅ Found image via Picsum for: {food_name}")
-                                return BytesIO(response.content)
-                        except:
-                            continue
+                    try:
+                        image_data = self.fetch_valid_image(url, timeout=15)
+                    except Exception:
+                        continue
                     
-                    time.sleep(0.5)
+                    if image_data:
+                        print(f"  ✅ Found image via Picsum for: {food_name}")
+                        return image_data
                     
                 except Exception as e:
                     print(f"    ❌ Picsum URL failed: {e}")
@@ -264,48 +354,85 @@ class RealFoodPhotoDownloader:
             print(f"❌ Picsum search error: {e}")
             return None
     
+    def image_cache_path(self, food_name):
+        """Local cache file for the photo of food_name"""
+        cleaned_name = self.clean_food_name_for_search(food_name).lower()
+        digest = hashlib.blake2b(cleaned_name.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.IMAGE_CACHE_DIR, digest + '.jpg')
+    
+    def save_to_image_cache(self, cache_path, image_data):
+        """Write image_data to the cache, atomically so readers never see a partial file"""
+        try:
+            os.makedirs(self.IMAGE_CACHE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.IMAGE_CACHE_DIR, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(image_data)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"  ⚠️ Could not cache image: {e}")
+    
     def download_real_food_image(self, food_name):
         """Download real food image using multiple sources"""
+        cache_path = self.image_cache_path(food_name)
+        try:
+            with open(cache_path, 'rb') as f:
+                print(f"  💾 Using cached image for: {food_name}")
+                return f.read()
+        except FileNotFoundError:
+            pass
+        
         print(f"🔍 Searching for real image: {food_name}")
         
-        # Try different sources in order of preference
+        # Query the food photo sources concurrently but take results in
+        # priority order, so a slower better source still wins
         sources = [
             self.search_unsplash_food_image,
-            self.search_foodish_api,
-            self.search_picsum_food_image
+            self.search_foodish_api
         ]
+        futures = [self.source_executor.submit(source_func, food_name) for source_func in sources]
         
-        for source_func in sources:
+        for future in futures:
             try:
-                image_data = source_func(food_name)
-                if image_data:
-                    return image_data
+                image_data = future.result()
             except Exception as e:
                 print(f"  ❌ Source failed: {e}")
                 continue
+            if image_data:
+                self.save_to_image_cache(cache_path, image_data)
+                return image_data
+        
+        # Picsum's random photos are only a fallback once the food sources fail
+        try:
+            image_data = self.search_picsum_food_image(food_name)
+        except Exception as e:
+            print(f"  ❌ Source failed: {e}")
+            image_data = None
+        if image_data:
+            self.save_to_image_cache(cache_path, image_data)
+            return image_data
         
         print(f"  ❌ No real image found for: {food_name}")
         return None
     
-    def upload_to_supabase(self, image_data, filename):
-        """Upload image to Supabase storage"""
+    def ensure_bucket(self):
+        """Create the menu-images bucket once per run"""
         try:
-            # Ensure we have the menu-images bucket
-            try:
-                self.supabase.storage.create_bucket('menu-images')
-            except:
-                pass  # Bucket might already exist
-            
-            # Convert BytesIO to bytes if needed
-            if hasattr(image_data, 'getvalue'):
-                file_bytes = image_data.getvalue()
-            else:
-                file_bytes = image_data
-            
-            # Upload file
+            self.supabase.storage.create_bucket('menu-images')
+        except Exception:
+            pass  # Bucket might already exist
+    
+    def upload_to_supabase(self, file_bytes, filename):
+        """Upload image bytes to Supabase storage"""
+        try:
+            # Upload the downloaded bytes as-is - no intermediate buffer copies
             result = self.supabase.storage.from_('menu-images').upload(
                 path=filename,
-                file=file_bytes
+                file=file_bytes,
+                file_options={'content-type': 'image/jpeg'}
             )
             
             if result:
@@ -320,20 +447,65 @@ class RealFoodPhotoDownloader:
             print(f"❌ Error uploading {filename}: {e}")
             return None
     
-    def update_menu_item_image(self, item_id, image_url):
-        """Update menu item with new image URL"""
+    def update_menu_item_images(self, rows):
+        """Save new image URLs for many menu items in one upsert
+        
+        rows are full menu_items rows, so the upsert never trips NOT NULL
+        columns. Returns the ids the database confirmed.
+        """
         try:
-            response = self.supabase.table('menu_items').update({
-                'image_url': image_url,
-                'updated_at': 'now()'
-            }).eq('id', item_id).execute()
+            response = self.supabase.table('menu_items').upsert(rows, on_conflict='id').execute()
+            return {row['id'] for row in response.data or []}
+        except Exception as e:
+            print(f"❌ Error updating {len(rows)} menu items: {e}")
+            return set()
+    
+    def process_item(self, index, total, item, force_update=False):
+        """Find and upload a real photo for one menu item
+        
+        Returns ('uploaded', updated_row), ('failed', None) or ('skipped', None);
+        updated rows are saved in bulk by process_all_items.
+        """
+        item_id = item.get('id')
+        item_name = item.get('name', 'Unknown')
+        current_image = item.get('image_url', '')
+        
+        print(f"\n📸 [{index}/{total}] Processing: {item_name}")
+        
+        # Skip if already has a real image (unless force update)
+        if not force_update and current_image and 'supabase.co' in current_image:
+            print(f"  ⏭️ Already has image, skipping")
+            return 'skipped', None
+        
+        try:
+            # Download real food image
+            image_data = self.download_real_food_image(item_name)
+            
+            if not image_data:
+                print(f"  ❌ Could not find real image")
+                return 'failed', None
+            
+            # Generate filename
+            safe_name = UNSAFE_FILENAME_CHARS_RE.sub('', item_name).strip()
+            safe_name = safe_name.replace(' ', '_').lower()
+            item_id_short = item_id[:8] if item_id else str(uuid.uuid4())[:8]
+            filename = f"real_{safe_name}_{item_id_short}.jpg"
+            
+            print(f"  📤 Uploading real image...")
+            image_url = self.upload_to_supabase(image_data, filename)
+            
+            if not image_url:
+                print(f"  ❌ Failed to upload image")
+                return 'failed', None
+            
+            print(f"  ✅ Uploaded, database update queued")
+            return 'uploaded', {**item, 'image_url': image_url, 'updated_at': 'now()'}
             
-            return True
         except Exception as e:
-            print(f"❌ Error updating menu item {item_id}: {e}")
-            return False
+            print(f"  ❌ Error processing {item_name}: {e}")
+            return 'failed', None
     
-    def process_all_items(self, limit=None, force_update=False):
+    def process_all_items(self, limit=None, force_update=False, workers=8):
         """Process all menu items with real food photos"""
         print("🔍 Loading menu items from database...")
         menu_items = self.get_menu_items()
@@ -348,60 +520,35 @@ class RealFoodPhotoDownloader:
             menu_items = menu_items[:limit]
             print(f"🎯 Processing first {len(menu_items)} items (limited)")
         
-        success_count = 0
-        failed_count = 0
-        skipped_count = 0
+        self.bucket_future.result()
         
-        for i, item in enumerate(menu_items, 1):
-            item_id = item.get('id')
-            item_name = item.get('name', 'Unknown')
-            current_image = item.get('image_url', '')
-            
-            print(f"\n📸 [{i}/{len(menu_items)}] Processing: {item_name}")
-            
-            # Skip if already has a real image (unless force update)
-            if not force_update and current_image and 'supabase.co' in current_image:
-                print(f"  ⏭️ Already has image, skipping")
-                skipped_count += 1
-                continue
-            
-            try:
-                # Download real food image
-                image_data = self.download_real_food_image(item_name)
-                
-                if not image_data:
-                    print(f"  ❌ Could not find real image")
-                    failed_count += 1
-                    continue
-                
-                # Generate filename
-                safe_name = "".join(c for c in item_name if c.isalnum() or c in (' ', '-', '_')).strip()
-                safe_name = safe_name.replace(' ', '_').lower()
-                item_id_short = item_id[:8] if item_id else str(uuid.uuid4())[:8]
-                filename = f"real_{safe_name}_{item_id_short}.jpg"
-                
-                print(f"  📤 Uploading real image...")
-                image_url = self.upload_to_supabase(image_data, filename)
-                
-                if image_url:
-                    # Update database
-                    print(f"  💾 Updating database...")
-                    if self.update_menu_item_image(item_id, image_url):
-                        print(f"  ✅ Successfully updated with REAL image: {item_name}")
-                        success_count += 1
-                    else:
-                        print(f"  ❌ Failed to update database")
-                        failed_count += 1
+        # Items are independent network work, so overlap them; the per-host
+        # rate limiter keeps each photo API from being hammered
+        total = len(menu_items)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda numbered: self.process_item(numbered[0], total, numbered[1], force_update),
+                enumerate(menu_items, 1)
+            ))
+        outcomes = [outcome for outcome, _ in results]
+        
+        # Save all new image URLs with a few bulk upserts instead of one UPDATE per item
+        updates = [row for outcome, row in results if outcome == 'uploaded']
+        success_count = 0
+        if updates:
+            print(f"\n💾 Updating database for {len(updates)} items...")
+        for start in range(0, len(updates), self.UPDATE_BATCH_SIZE):
+            batch = updates[start:start + self.UPDATE_BATCH_SIZE]
+            saved_ids = self.update_menu_item_images(batch)
+            for row in batch:
+                if row['id'] in saved_ids:
+                    print(f"  ✅ Successfully updated with REAL image: {row.get('name', 'Unknown')}")
+                    success_count += 1
                 else:
-                    print(f"  ❌ Failed to upload image")
-                    failed_count += 1
-                
-                # Delay to be respectful to APIs
-                time.sleep(2)
-                
-            except Exception as e:
-                print(f"  ❌ Error processing {item_name}: {e}")
-                failed_count += 1
+                    print(f"  ❌ Failed to update database: {row.get('name', 'Unknown')}")
+        
+        failed_count = outcomes.count('failed') + len(updates) - success_count
+        skipped_count = outcomes.count('skipped')
         
         print(f"\n🎉 Processing complete!")
         print(f"✅ Success: {success_count} items updated with REAL food images")
@@ -422,6 +569,7 @@ def main():
     parser.add_argument('--limit', type=int, help='Limit number of items to process')
     parser.add_argument('--test', action='store_true', help='Test mode - process only 3 items')
     parser.add_argument('--force', action='store_true', help='Force update all images, even existing ones')
+    parser.add_argument('--workers', type=int, default=8, help='Number of items to process in parallel')
     args = parser.parse_args()
     
     if args.test:
@@ -432,7 +580,7 @@ def main():
     
     try:
         downloader = RealFoodPhotoDownloader()
-        downloader.process_all_items(limit=limit, force_update=args.force)
+        downloader.process_all_items(limit=limit, force_update=args.force, workers=args.workers)
         print("\n🎉 All done! Your menu now has REAL food photos!")
     except KeyboardInterrupt:
         print("\n⏹️ Process interrupted by user")
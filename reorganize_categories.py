@@ -5,90 +5,169 @@ Script to reorganize menu categories to be more customer-friendly
 
 import sys
 import os
-from datetime import datetime
+import re
+import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
 
 # Add current directory to path to import app modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import from the main app
-from app import supabase, get_menu_items_from_supabase
+from app import supabase, get_menu_items_from_supabase, write_file_atomically
+from postgrest.types import ReturnMethod
+
+# Concurrent update requests - one per target category
+UPDATE_WORKERS = 4
+
+# Category mapping for better organization
+CATEGORY_MAPPING = {
+    # Combine related items into main categories
+    'Soup': 'Appetizers',
+    'Starters': 'Appetizers', 
+    'Sandwiches': 'Main Course',
+    'Salads': 'Main Course',
+    'Grill Recipes': 'Main Course',
+    'Side Dishes': 'Main Course',
+    'Rice': 'Main Course',
+    'Noodles': 'Main Course', 
+    'Pasta': 'Main Course',
+    'Main Dishes': 'Main Course'
+}
+
+# More specific categorization based on item names; earlier rules win
+NAME_CATEGORY_RULES = [
+    (['soup', 'broth', 'cream of'], 'Appetizers'),
+    (['sandwich', 'bread', 'fries'], 'Appetizers'),
+    (['salad'], 'Appetizers'),
+    (['rice', 'noodles', 'pasta', 'spaghetti', 'biriyani', 'fried rice', 'chopsuey'], 'Main Course'),
+    (['chicken', 'beef', 'pork', 'fish', 'prawn', 'seafood', 'grill'], 'Main Course'),
+    (['ice cream', 'cake', 'dessert', 'sweet'], 'Desserts'),
+    (['juice', 'tea', 'coffee', 'water', 'soda', 'drink'], 'Beverages'),
+]
+
+# All rules in one pattern, one named group per rule, so a name is scanned
+# once. Keywords match as plain substrings ('grill' in 'grilled', 'fish' in
+# 'cuttlefish'); the lookahead tests every position, so overlapping keywords
+# from different rules are all seen
+NAME_CATEGORY_RE = re.compile('(?=' + '|'.join(
+    rf'(?P<rule{index}>{"|".join(re.escape(word) for word in words)})'
+    for index, (words, _) in enumerate(NAME_CATEGORY_RULES)
+) + ')')
+
+def decide_category(item):
+    """Customer-friendly category for a menu item"""
+    old_category = item.get('category', 'Main Course')
+    new_category = CATEGORY_MAPPING.get(old_category, old_category)
+    
+    # Special categorization based on item names
+    return category_from_name(item.get('name', '').lower()) or new_category
+
+def category_from_name(item_name):
+    """Category of the highest-priority rule matching item_name, or None"""
+    rule_indexes = [int(match.lastgroup[4:]) for match in NAME_CATEGORY_RE.finditer(item_name)]
+    return NAME_CATEGORY_RULES[min(rule_indexes)][1] if rule_indexes else None
+
+def upsert_menu_rows(rows, label):
+    """Upsert rows in one request, retrying row by row only if the batch fails"""
+    try:
+        supabase.table('menu_items').upsert(
+            rows, on_conflict='id', returning=ReturnMethod.minimal
+        ).execute()
+        for row in rows:
+            print(f"✅ Added {label}: {row['name']}")
+        return
+    except Exception as e:
+        print(f"⚠️ Batch upsert of {label}s failed, retrying individually: {e}")
+    
+    for row in rows:
+        try:
+            supabase.table('menu_items').upsert(
+                row, on_conflict='id', returning=ReturnMethod.minimal
+            ).execute()
+            print(f"✅ Added {label}: {row['name']}")
+        except Exception as e:
+            print(f"❌ Failed to add {row['name']}: {e}")
+
+def get_menu_items_slim():
+    """Load only the columns the reorganize steps use (id, name, category)"""
+    try:
+        result = supabase.table('menu_items').select('id,name,category').execute()
+        return result.data or []
+    except Exception as e:
+        print(f"❌ Failed to load menu items: {e}")
+        return []
 
 def print_section(title):
     print("\n" + "="*60)
     print(f" {title}")
     print("="*60)
 
-def reorganize_categories():
-    """Reorganize menu items into customer-friendly categories"""
+def reorganize_categories(current_items, verbose=False, plan_only=False):
+    """Reorganize menu items into customer-friendly categories (updates current_items in place)
+    
+    Per-item changes are only listed when verbose; otherwise one line per category.
+    With plan_only the changes are listed but nothing is written.
+    """
     print_section("Reorganizing Menu Categories")
     
-    # Category mapping for better organization
-    category_mapping = {
-        # Combine related items into main categories
-        'Soup': 'Appetizers',
-        'Starters': 'Appetizers', 
-        'Sandwiches': 'Main Course',
-        'Salads': 'Main Course',
-        'Grill Recipes': 'Main Course',
-        'Side Dishes': 'Main Course',
-        'Rice': 'Main Course',
-        'Noodles': 'Main Course', 
-        'Pasta': 'Main Course',
-        'Main Dishes': 'Main Course'
-    }
-    
-    # Get current menu items
-    current_items = get_menu_items_from_supabase()
     if not current_items:
         print("❌ No menu items found")
         return
     
     print(f"📊 Processing {len(current_items)} menu items")
     
-    # Categorize items more intelligently
+    # Decide every item's category up front; only changed items go to the database
     updated_count = 0
-    category_counts = {}
+    log_lines = []
+    decisions = [(item, item.get('category', 'Main Course'), decide_category(item)) for item in current_items]
+    category_counts = Counter(new_category for _, _, new_category in decisions)
+    changes = [decision for decision in decisions if decision[2] != decision[1]]
     
-    for item in current_items:
-        old_category = item.get('category', 'Main Course')
-        new_category = category_mapping.get(old_category, old_category)
-        
-        # Special categorization based on item names
-        item_name = item.get('name', '').lower()
-        
-        # More specific categorization
-        if any(word in item_name for word in ['soup', 'broth', 'cream of']):
-            new_category = 'Appetizers'
-        elif any(word in item_name for word in ['sandwich', 'bread', 'fries']):
-            new_category = 'Appetizers'
-        elif any(word in item_name for word in ['salad']):
-            new_category = 'Appetizers'
-        elif any(word in item_name for word in ['rice', 'noodles', 'pasta', 'spaghetti', 'biriyani', 'fried rice', 'chopsuey']):
-            new_category = 'Main Course'
-        elif any(word in item_name for word in ['chicken', 'beef', 'pork', 'fish', 'prawn', 'seafood', 'grill']):
-            new_category = 'Main Course'
-        elif any(word in item_name for word in ['ice cream', 'cake', 'dessert', 'sweet']):
-            new_category = 'Desserts'
-        elif any(word in item_name for word in ['juice', 'tea', 'coffee', 'water', 'soda', 'drink']):
-            new_category = 'Beverages'
-        
-        # Count categories
-        if new_category not in category_counts:
-            category_counts[new_category] = 0
-        category_counts[new_category] += 1
-        
-        # Update if category changed
-        if new_category != old_category:
+    if plan_only:
+        print(f"📝 Plan: {len(changes)} of {len(current_items)} items would change category")
+        sys.stdout.write(''.join(f"   {item['name']}: {old} -> {new}\n" for item, old, new in changes))
+        return
+    
+    # One UPDATE ... WHERE id IN (...) per target category instead of one per item
+    changes_by_category = defaultdict(list)
+    for change in changes:
+        changes_by_category[change[2]].append(change)
+    
+    def update_category(new_category, category_changes):
+        ids = [item['id'] for item, _, _ in category_changes]
+        return supabase.table('menu_items').update({
+            'category': new_category
+        }).in_('id', ids).execute()
+    
+    # Send the category updates concurrently so each one doesn't wait on the last round-trip
+    with ThreadPoolExecutor(max_workers=UPDATE_WORKERS) as executor:
+        futures = {
+            executor.submit(update_category, new_category, category_changes): category_changes
+            for new_category, category_changes in changes_by_category.items()
+        }
+        for future in as_completed(futures):
+            category_changes = futures[future]
             try:
-                result = supabase.table('menu_items').update({
-                    'category': new_category
-                }).eq('id', item['id']).execute()
-                
-                print(f"✅ {item['name']}: {old_category} -> {new_category}")
-                updated_count += 1
+                future.result()
+                for item, old_category, new_category in category_changes:
+                    item['category'] = new_category
+                    log_lines.append(f"✅ {item['name']}: {old_category} -> {new_category}")
+                if not verbose:
+                    print(f"✅ {len(category_changes)} items -> {category_changes[0][2]}")
+                updated_count += len(category_changes)
                 
             except Exception as e:
-                print(f"❌ Failed to update {item['name']}: {e}")
+                names = ', '.join(item['name'] for item, _, _ in category_changes)
+                print(f"❌ Failed to update {names}: {e}")
+    
+    # One write for the whole listing rather than a print per item
+    if verbose and log_lines:
+        sys.stdout.write('\n'.join(log_lines) + '\n')
+    
+    # Later steps should see the new categories, not the cached ones
+    get_menu_items_from_supabase.cache_clear()
     
     print(f"\n✅ Updated {updated_count} items")
     print("\n📊 Final Category Distribution:")
@@ -114,36 +193,55 @@ def update_customer_page_categories():
         
         new_categories_html = '\n            '.join(category_buttons)
         
-        # Replace the menu categories section
-        import re
-        pattern = r'<div class="menu-categories">(.*?)</div>'
-        replacement = f'''<div class="menu-categories">
-            {new_categories_html}
-        </div>'''
+        # Replace the menu categories section by splicing between its tags
+        opening_tag = '<div class="menu-categories">'
+        start = content.find(opening_tag)
+        end = content.find('</div>', start) if start != -1 else -1
+        if end == -1:
+            print(f"❌ Menu categories section not found in {customer_html_path}")
+            return
+        
+        updated_content = (
+            content[:start + len(opening_tag)]
+            + f"\n            {new_categories_html}\n        "
+            + content[end:]
+        )
         
-        updated_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+        # Leave the file (and the reloader) alone when nothing would change
+        if updated_content == content:
+            print(f"⏭️  Menu categories in {customer_html_path} already up to date")
+            return
         
-        with open(customer_html_path, 'w') as f:
-            f.write(updated_content)
+        # Never leave a half-written template behind
+        write_file_atomically(customer_html_path, updated_content)
         
         print(f"✅ Updated menu categories to: {', '.join(final_categories)}")
         
     except Exception as e:
         print(f"❌ Failed to update customer page: {e}")
 
-def add_beverages_and_desserts():
-    """Add some beverages and desserts if they don't exist"""
+def add_beverages_and_desserts(current_items=None):
+    """Add some beverages and desserts if they don't exist
+    
+    Uses current_items when the caller already has the menu; otherwise asks the
+    database only which of the two categories exist.
+    """
     print_section("Adding Missing Categories")
     
-    # Check current items
-    current_items = get_menu_items_from_supabase()
-    if not current_items:
+    if current_items is None:
+        try:
+            result = supabase.table('menu_items').select('category').in_(
+                'category', ['Beverages', 'Desserts']
+            ).execute()
+        except Exception as e:
+            print(f"❌ Failed to check existing categories: {e}")
+            return
+        categories = {row['category'] for row in result.data or []}
+    elif not current_items:
         print("❌ No menu items found")
         return
-    
-    categories = set()
-    for item in current_items:
-        categories.add(item.get('category', 'Main Course'))
+    else:
+        categories = {item.get('category', 'Main Course') for item in current_items}
     
     # Add beverages if missing
     if 'Beverages' not in categories:
@@ -177,12 +275,7 @@ def add_beverages_and_desserts():
             }
         ]
         
-        for beverage in beverages:
-            try:
-                result = supabase.table('menu_items').upsert(beverage).execute()
-                print(f"✅ Added beverage: {beverage['name']}")
-            except Exception as e:
-                print(f"❌ Failed to add {beverage['name']}: {e}")
+        upsert_menu_rows(beverages, 'beverage')
     
     # Add desserts if missing
     if 'Desserts' not in categories:
@@ -216,26 +309,35 @@ def add_beverages_and_desserts():
             }
         ]
         
-        for dessert in desserts:
-            try:
-                result = supabase.table('menu_items').upsert(dessert).execute()
-                print(f"✅ Added dessert: {dessert['name']}")
-            except Exception as e:
-                print(f"❌ Failed to add {dessert['name']}: {e}")
+        upsert_menu_rows(desserts, 'dessert')
+    
+    # Anything reading the menu after this should see the new items
+    get_menu_items_from_supabase.cache_clear()
 
 def main():
+    parser = argparse.ArgumentParser(description='Reorganize menu categories')
+    parser.add_argument('--verbose', action='store_true', help='List every item whose category changed')
+    parser.add_argument('--plan-only', action='store_true', help='Show the category changes without writing anything')
+    args = parser.parse_args()
+    
     print("🔄 Green Heaven Menu Category Reorganization")
-    print(f"🕒 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"🕒 Started at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     
     if not supabase:
         print("❌ Supabase not available")
         return
     
+    # Read the menu once; the steps below work on (and update) this list
+    current_items = get_menu_items_slim()
+    
     # Step 1: Reorganize existing categories
-    reorganize_categories()
+    reorganize_categories(current_items, verbose=args.verbose, plan_only=args.plan_only)
+    if args.plan_only:
+        print("\n📝 Plan only - no changes written")
+        return
     
     # Step 2: Add missing beverages and desserts
-    add_beverages_and_desserts()
+    add_beverages_and_desserts(current_items)
     
     # Step 3: Update customer page
     update_customer_page_categories()
@@ -245,7 +347,7 @@ def main():
     print("✅ All items have proper images (m.png)")
     print("✅ Customer page updated with new filters")
     print("🔄 Please restart the server to see changes")
-    print(f"🕒 Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"🕒 Completed at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
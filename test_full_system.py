@@ -5,15 +5,22 @@ Tests all major functionality and displays results
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from json_io import read_json_file
+
 # Configuration
 BASE_URL = "http://localhost:5001"
 TEST_TABLE = "1"
 TEST_CUSTOMER = "Test Customer"
 
+# One keep-alive session for every call to the local server
+http_session = requests.Session()
+http_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 def print_section(title):
     print("\n" + "="*60)
     print(f" {title}")
@@ -30,7 +37,7 @@ def test_customer_entry():
     }
     
     try:
-        response = requests.post(url, json=data)
+        response = http_session.post(url, json=data)
         if response.status_code == 200:
             print("✅ Customer entry successful")
             return response.json()
@@ -47,7 +54,7 @@ def test_place_order():
     
     # First get menu items
     try:
-        menu_response = requests.get(f"{BASE_URL}/api/menu")
+        menu_response = http_session.get(f"{BASE_URL}/api/menu")
         if menu_response.status_code != 200:
             print("❌ Failed to get menu items")
             return None
@@ -76,7 +83,7 @@ def test_place_order():
             ]
         }
         
-        response = requests.post(url, json=order_data)
+        response = http_session.post(url, json=order_data)
         if response.status_code == 200:
             result = response.json()
             print(f"✅ Order placed successfully - Order ID: {result.get('order_id')}")
@@ -101,7 +108,7 @@ def test_order_status_updates(order_id):
             url = f"{BASE_URL}/api/orders/{order_id}"
             data = {"status": status}
             
-            response = requests.put(url, json=data)
+            response = http_session.put(url, json=data)
             if response.status_code == 200:
                 print(f"✅ Order status updated to: {status}")
                 time.sleep(1)  # Brief pause between updates
@@ -122,7 +129,7 @@ def test_call_staff():
     }
     
     try:
-        response = requests.post(url, json=data)
+        response = http_session.post(url, json=data)
         if response.status_code == 200:
             print("✅ Staff call successful")
             return True
@@ -139,8 +146,7 @@ def display_current_data():
     
     try:
         # Check orders
-        with open('data/orders.json', 'r') as f:
-            orders = json.load(f)
+        orders = read_json_file('data/orders.json')
         print(f"📊 Orders in system: {len(orders)}")
         
         for order in orders[-3:]:  # Show last 3 orders
@@ -148,8 +154,7 @@ def display_current_data():
         
         # Check daily totals
         try:
-            with open('data/daily_totals.json', 'r') as f:
-                totals = json.load(f)
+            totals = read_json_file('data/daily_totals.json')
             
             today = datetime.now().strftime('%Y-%m-%d')
             if today in totals:
@@ -167,21 +172,24 @@ def display_current_data():
 def run_full_test():
     """Run complete system test"""
     print("🧪 Starting Full System Test")
-    print(f"🕒 Test started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    # Test customer entry
-    customer_result = test_customer_entry()
+    print(f"🕒 Test started at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Test order placement
-    order_result = test_place_order()
-    if order_result and 'order_id' in order_result:
-        order_id = order_result['order_id']
+    # Customer entry and call staff don't depend on the order, so run them
+    # alongside the order flow instead of waiting on each round-trip in turn
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        customer_future = executor.submit(test_customer_entry)
+        staff_future = executor.submit(test_call_staff)
         
-        # Test status updates
-        test_order_status_updates(order_id)
-    
-    # Test call staff
-    test_call_staff()
+        # Test order placement
+        order_result = test_place_order()
+        if order_result and 'order_id' in order_result:
+            order_id = order_result['order_id']
+            
+            # Test status updates (serial - each depends on the last)
+            test_order_status_updates(order_id)
+        
+        customer_result = customer_future.result()
+        staff_future.result()
     
     # Display current data
     display_current_data()
@@ -191,7 +199,7 @@ def run_full_test():
     print("🎯 Check the web interface to see real-time updates")
     print("📱 Customer page: http://localhost:5001/customer-entry")
     print("👥 Staff dashboard: http://localhost:5001/staff")
-    print(f"🕒 Test completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"🕒 Test completed at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
 
 if __name__ == "__main__":
     run_full_test()
\ No newline at end of file
@@ -5,24 +5,55 @@ Test menu filtering functionality
 
 import requests
 import json
+import os
+import hashlib
+from collections import Counter
+
+# Responses cached between runs, revalidated with the server's ETag
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+def get_json_cached(url):
+    """GET url as JSON, reusing the cached body when the server answers 304
+    
+    Returns (status_code, data).
+    """
+    key = hashlib.sha1(url.encode()).hexdigest()
+    body_path = os.path.join(CACHE_DIR, key + '.json')
+    etag_path = os.path.join(CACHE_DIR, key + '.etag')
+    
+    headers = {}
+    if os.path.exists(body_path) and os.path.exists(etag_path):
+        with open(etag_path) as f:
+            headers['If-None-Match'] = f.read().strip()
+    
+    response = requests.get(url, headers=headers)
+    if response.status_code == 304:
+        with open(body_path, 'rb') as f:
+            return 200, json.loads(f.read())
+    
+    if response.status_code == 200 and response.headers.get('ETag'):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Body first, then the ETag, so a stale ETag never points at a missing body
+        for path, content in ((body_path, response.content), (etag_path, response.headers['ETag'].encode())):
+            with open(path + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+    
+    return response.status_code, response.json() if response.status_code == 200 else None
 
 def test_menu_api():
     """Test the menu API and check categories"""
     try:
-        response = requests.get('http://localhost:5001/api/menu')
-        if response.status_code == 200:
-            menu_items = response.json()
+        status_code, menu_items = get_json_cached('http://localhost:5001/api/menu')
+        if status_code == 200:
             print(f"✅ Menu API working - {len(menu_items)} items loaded")
             
-            # Get unique categories
-            categories = set()
-            for item in menu_items:
-                categories.add(item.get('category', 'Unknown'))
+            # Get unique categories and their sizes in one pass
+            categories = Counter(item.get('category', 'Unknown') for item in menu_items)
             
             print(f"📋 Categories found in database:")
             for cat in sorted(categories):
-                count = len([item for item in menu_items if item.get('category') == cat])
-                print(f"  - {cat}: {count} items")
+                print(f"  - {cat}: {categories[cat]} items")
             
             print(f"\n🔍 Category buttons should have these data-category values:")
             for cat in sorted(categories):
@@ -30,7 +61,7 @@ def test_menu_api():
                 
             return True
         else:
-            print(f"❌ Menu API failed with status {response.status_code}")
+            print(f"❌ Menu API failed with status {status_code}")
             return False
             
     except Exception as e:
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test that name-based categorization matches the original keyword checks
+"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from reorganize_categories import NAME_CATEGORY_RULES, category_from_name
+
+MENU_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Green_Heaven_Complete_Menu.txt')
+
+def load_menu_names():
+    """Item names from the exported menu ('12. Chicken Sandwich   LKR 1,200.00')"""
+    names = []
+    with open(MENU_FILE, encoding='utf-8') as f:
+        for line in f:
+            match = re.match(r'\d+\.\s+(.*?)\s+LKR', line)
+            if match:
+                names.append(match.group(1))
+    return names
+
+def original_category_from_name(item_name):
+    """The if/elif substring checks reorganize_categories used before the combined regex"""
+    for words, category in NAME_CATEGORY_RULES:
+        if any(word in item_name for word in words):
+            return category
+    return None
+
+def test_categories_match_original_checks():
+    names = load_menu_names()
+    assert names, f"No menu items found in {MENU_FILE}"
+
+    mismatches = []
+    for name in names:
+        item_name = name.lower()
+        expected = original_category_from_name(item_name)
+        actual = category_from_name(item_name)
+        if actual != expected:
+            mismatches.append(f"{name}: expected {expected}, got {actual}")
+
+    assert not mismatches, "\n".join(mismatches)
+    print(f"✅ {len(names)} menu names categorized the same as the original checks")
+
+if __name__ == "__main__":
+    test_categories_match_original_checks()